@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import OrderedDict
+
+# rough in-memory size of loaded artist data relative to its JSON file on disk,
+# for data that can't measure itself (see lyrics_index.ArtistData.memory_bytes)
+MEMORY_PER_FILE_BYTE = 4
+
+def memory_cost(artist_data, file_size):
+    memory_bytes = getattr(artist_data, 'memory_bytes', None)
+    if memory_bytes is not None:
+        return memory_bytes()
+    return file_size * MEMORY_PER_FILE_BYTE
+
+# process-wide cache of loaded artist data keyed by artist name.
+# an entry is dropped when its file's mtime or size changes, and the least recently
+# used artists are evicted once the estimated memory use goes over max_bytes.
+# an entry's cost is measured again on every get, so the corpus and indexes built
+# since the last access are charged to it
+class ArtistCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # artist name -> (stamp, cost, artist_data)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(data_file):
+        try:
+            stat = os.stat(data_file)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get(self, artist_name, data_file):
+        stamp = self._stamp(data_file)
+        with self.lock:
+            entry = self.entries.get(artist_name)
+            if entry is None:
+                return None
+            if entry[0] != stamp:
+                self._remove(artist_name)
+                return None
+            self.entries.move_to_end(artist_name)
+            cost = memory_cost(entry[2], stamp[0])
+            if cost != entry[1]:
+                self.entries[artist_name] = (stamp, cost, entry[2])
+                self.total_bytes += cost - entry[1]
+                self._evict()
+            return entry[2]
+
+    def put(self, artist_name, data_file, artist_data):
+        stamp = self._stamp(data_file)
+        if stamp is None:
+            return
+        cost = memory_cost(artist_data, stamp[0])
+        with self.lock:
+            self._remove(artist_name)
+            if cost > self.max_bytes:
+                return
+            self.entries[artist_name] = (stamp, cost, artist_data)
+            self.total_bytes += cost
+            self._evict()
+
+    # drops the least recently used entries until the total fits again
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+
+    def invalidate(self, artist_name):
+        with self.lock:
+            self._remove(artist_name)
+
+    def clear(self):
+        with self.lock:
+            for artist_name in list(self.entries):
+                self._remove(artist_name)
+
+    # drops an entry without closing its data: searches may still be reading it, the mapping
+    # of a binary cache is released once the last of them lets go of it
+    def _remove(self, artist_name):
+        entry = self.entries.pop(artist_name, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
@@ -0,0 +1,63 @@
+import os
+import json
+import time
+import threading
+
+# persistent artist name -> {'id', 'name', 'image_url'} cache, so each artist costs
+# at most one search_artist call per TTL however many code paths need to resolve it
+class ArtistResolver:
+    def __init__(self, path, ttl_seconds):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.name_locks = {}
+        self.entries = None
+
+    @staticmethod
+    def _key(artist_name):
+        return ' '.join(artist_name.split()).lower()
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_file = self.path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, self.path)
+
+    # the cached resolution, None if the artist was never resolved or it expired
+    def get(self, artist_name):
+        with self.lock:
+            entry = self._load().get(self._key(artist_name))
+        if entry is None or time.time() - entry.get('resolved_at', 0) > self.ttl_seconds:
+            return None
+        return entry['artist']
+
+    def put(self, artist_name, artist_info):
+        with self.lock:
+            self._load()[self._key(artist_name)] = {'artist': artist_info, 'resolved_at': time.time()}
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Warning: could not save the artist cache: {e}")
+
+    # the cached resolution, or lookup(artist_name) stored for next time.
+    # concurrent callers for the same artist wait for a single lookup
+    def resolve(self, artist_name, lookup):
+        with self.lock:
+            name_lock = self.name_locks.setdefault(self._key(artist_name), threading.Lock())
+        with name_lock:
+            artist_info = self.get(artist_name)
+            if artist_info is None:
+                artist_info = lookup(artist_name)
+                if artist_info:
+                    self.put(artist_name, artist_info)
+            return artist_info
@@ -0,0 +1,91 @@
+from bisect import bisect_right
+
+# pyahocorasick, when installed, matches all the terms in a single C pass
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# one pass over a text finding every occurrence of many terms, overlapping ones included,
+# through an Aho-Corasick automaton (needs pyahocorasick)
+class TermMatcher:
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(terms))
+        self.automaton = None
+        if self.terms:
+            self.automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self.automaton.add_word(term, term)
+            self.automaton.make_automaton()
+
+    # (position, term) per occurrence, positions never decreasing. the position
+    # falls inside the occurrence, so it tells which line the term was found on
+    def iter_matches(self, text):
+        if self.automaton is not None:
+            yield from self.automaton.iter(text)
+
+# occurrences of the term in the text, overlapping ones included
+def count_occurrences(text, term):
+    # only a term that starts with its own ending can overlap itself ("lala" in "lalala")
+    if not any(term.startswith(term[-size:]) for size in range(1, len(term))):
+        return text.count(term)
+    count = 0
+    pos = text.find(term)
+    while pos != -1:
+        count += 1
+        pos = text.find(term, pos + 1)
+    return count
+
+# ids of the lines matching each term, plus its total number of occurrences. terms must
+# already be lowercased. with pyahocorasick it is one pass over the corpus' joined lines;
+# without it each term is looked up on its own, which beats any pure Python single pass
+def match_terms(corpus, terms):
+    terms = list(dict.fromkeys(terms))
+    if ahocorasick is None:
+        return _match_terms_separately(corpus, terms)
+    line_ids = {term: [] for term in terms}
+    matches = dict.fromkeys(terms, 0)
+    blob, line_starts = corpus.joined_lines()
+
+    # same edge cases as LyricsCorpus.scan: the empty word is in every line,
+    # a newline in no line
+    line_count = len(line_starts) - 1
+    for term in terms:
+        if not term:
+            line_ids[term] = list(range(line_count))
+    matcher = TermMatcher(term for term in terms if term and '\n' not in term)
+
+    line_id = -1
+    line_end = 0
+    for pos, term in matcher.iter_matches(blob):
+        matches[term] += 1
+        if pos >= line_end:
+            line_id = bisect_right(line_starts, pos) - 1
+            line_end = line_starts[line_id + 1]
+        ids = line_ids[term]
+        if not ids or ids[-1] != line_id:
+            ids.append(line_id)
+    return line_ids, matches
+
+# match_terms one term at a time: the corpus' own line lookup (trigrams once they are
+# built, else the find() scan) and a count over the joined lines
+def _match_terms_separately(corpus, terms):
+    find_lines = getattr(corpus, 'iter_line_ids', corpus.iter_scan)
+    blob = corpus.joined_lines()[0]
+    line_ids = {}
+    matches = {}
+    for term in terms:
+        line_ids[term] = list(find_lines(term))
+        matches[term] = count_occurrences(blob, term) if term and '\n' not in term else 0
+    return line_ids, matches
+
+# {term: (title, matching lines) per song} and {term: {'songs', 'lines', 'matches'}}
+# for many terms at once, each result the same corpus.search(term) would give
+def search_terms(corpus, terms):
+    line_ids, matches = match_terms(corpus, terms)
+    results = {}
+    counts = {}
+    for term, ids in line_ids.items():
+        results[term] = corpus.group(ids)
+        counts[term] = {'songs': len(results[term]), 'lines': len(ids), 'matches': matches[term]}
+    return results, counts
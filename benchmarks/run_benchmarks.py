@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import contextlib
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import main
+import lyrics_index
+import artist_resolver
+from benchmarks import synthetic
+
+# benchmarks search, cache load and ingest on synthetic artists, in a temporary data
+# directory so the real caches are never touched. prints one JSON document, e.g.
+#   python benchmarks/run_benchmarks.py --sizes 50,500 --output before.json
+# and compare the files of two runs
+
+# what is searched in every corpus: ranks into the vocabulary, most frequent first
+SEARCH_WORDS = {
+    'common': lambda vocabulary: vocabulary[0],
+    'medium': lambda vocabulary: vocabulary[50],
+    'rare': lambda vocabulary: vocabulary[-1],
+    'short': lambda vocabulary: 'a',
+    'absent': lambda vocabulary: 'zzqxv',
+    'phrase': lambda vocabulary: f"{vocabulary[0]} {vocabulary[1]}",
+}
+
+# the first search of a corpus: its most frequent word long enough for the trigram path,
+# the shortest words being answered from the token index instead
+def first_word(vocabulary):
+    return next(word for word in vocabulary if len(word) >= 3)
+
+# songs released between the fetch benchmark and its update
+UPDATE_NEW_SONGS = 5
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def rank(p):
+        return samples[min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))]
+
+    return {
+        'p50': round(rank(50), 3),
+        'p90': round(rank(90), 3),
+        'p99': round(rank(99), 3),
+        'max': round(samples[-1], 3),
+        'mean': round(sum(samples) / len(samples), 3),
+    }
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+# points main at another data directory and artist resolution cache, with an empty memory cache
+def use_data_dir(data_dir, resolved_artists):
+    main.data_dir = data_dir
+    main.resolved_artists = resolved_artists
+    main.loaded_artists.clear()
+
+def bench_corpus(artist_name, artist_data, vocabulary, repeat):
+    main.save_artist_data(artist_name, lyrics_index.ArtistData(artist_data))
+    data_file = os.path.join(main.data_dir, f"{artist_name}_lyrics.json")
+
+    # cold loads straight from the JSON file
+    load_samples = []
+    for _ in range(3):
+        main.loaded_artists.clear()
+        start = time.perf_counter()
+        loaded = main.load_cached_artist_data(artist_name)
+        load_samples.append(_ms(start))
+
+    # first search builds the corpus and scans it, measured with the memory it takes
+    main.loaded_artists.clear()
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = main.load_cached_artist_data(artist_name)
+    main.search_word_in_lyrics(first_word(vocabulary), loaded, artist_name)
+    first_search_ms = _ms(start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # plain scans, before any trigram index exists
+    corpus = lyrics_index.get_corpus(loaded)
+    scan = {}
+    for label, pick in SEARCH_WORDS.items():
+        word = pick(vocabulary)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            corpus.search(word, trigrams=False)
+            samples.append(_ms(start))
+        scan[label] = dict(word=word, **percentiles(samples))
+
+    # the trigram index, built up front so no search sample pays for it (or races the
+    # background build a corpus starts by itself after enough searches)
+    start = time.perf_counter()
+    trigram_index = corpus.trigram_index()
+    trigram_build_ms = _ms(start)
+
+    search = {}
+    for label, pick in SEARCH_WORDS.items():
+        word = pick(vocabulary)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            main.search_word_in_lyrics(word, loaded, artist_name)
+            samples.append(_ms(start))
+        search[label] = dict(word=word, **percentiles(samples))
+
+    # every word at once through the single-pass matcher
+    words = [pick(vocabulary) for pick in SEARCH_WORDS.values()]
+    batch_samples = []
+    for _ in range(max(1, repeat // 4)):
+        start = time.perf_counter()
+        main.search_words_in_lyrics(words, loaded, artist_name)
+        batch_samples.append(_ms(start))
+
+    return {
+        'songs': len(artist_data['songs']),
+        'lines': len(corpus.lines),
+        'file_bytes': os.path.getsize(data_file),
+        'load_ms': percentiles(load_samples),
+        'first_search_ms': round(first_search_ms, 3),
+        'peak_memory_mb': round(peak / 1024 / 1024, 3),
+        'scan_ms': scan,
+        'trigram_build_ms': round(trigram_build_ms, 3),
+        'trigram_memory_mb': round(trigram_index.memory_bytes / 1024 / 1024, 3),
+        'search_ms': search,
+        'batch_search_ms': percentiles(batch_samples),
+    }
+
+# one ingest per fetch mode, lean (lyrics straight from the listing) and full (song request first)
+def bench_fetch(song_count, latency, workers, requests_per_second):
+    artist_data = synthetic.make_artist_data(song_count, seed=song_count)
+    results = {}
+    for mode, lean in (('lean', True), ('full', False)):
+        fake = synthetic.FakeGenius(artist_data, latency)
+        genius = main.genius
+        main.genius = fake
+        stats = {}
+        try:
+            start = time.perf_counter()
+            fetched = main.get_artist_data_with_progress('fetch bench', force_update=True, workers=workers,
+                                                         requests_per_second=requests_per_second, lean=lean, stats=stats)
+            elapsed = time.perf_counter() - start
+        finally:
+            main.genius = genius
+        results[mode] = {
+            'songs': len(fetched['songs']) if fetched else 0,
+            'latency_s': latency,
+            'workers': workers,
+            'requests_per_second': requests_per_second,
+            'seconds': round(elapsed, 3),
+            'songs_per_second': round(len(fetched['songs']) / elapsed, 3) if fetched else 0,
+            'api_calls': stats.get('api_calls'),
+            'api_calls_by_method': dict(fake.calls),
+        }
+    return results
+
+# refresh of the artist bench_fetch saved once new_songs more came out: the listing is
+# paged newest first and should stop at the first page made only of known songs
+def bench_update(song_count, new_songs, latency, workers, requests_per_second):
+    # the same seed gives the same first song_count songs
+    fake = synthetic.FakeGenius(synthetic.make_artist_data(song_count + new_songs, seed=song_count), latency)
+    genius = main.genius
+    main.genius = fake
+    stats = {}
+    try:
+        start = time.perf_counter()
+        updated = main.update_artist_data('fetch bench', workers=workers, requests_per_second=requests_per_second, stats=stats)
+        elapsed = time.perf_counter() - start
+    finally:
+        main.genius = genius
+    return {
+        'songs': len(updated['songs']) if updated else 0,
+        'new_songs': new_songs,
+        'seconds': round(elapsed, 3),
+        'api_calls': stats.get('api_calls'),
+        'api_calls_by_method': dict(fake.calls),
+    }
+
+def run(sizes, line_words, repeat, fetch_songs, latency, workers, requests_per_second):
+    data_dir = tempfile.mkdtemp(prefix='lyrics-bench-')
+    data_dir_before = main.data_dir
+    resolved_artists_before = main.resolved_artists
+    try:
+        use_data_dir(data_dir, artist_resolver.ArtistResolver(os.path.join(data_dir, '.cache', 'artists.json'), 0))
+        vocabulary = synthetic.make_vocabulary()
+        corpora = []
+        for size in sizes:
+            for words_per_line in line_words:
+                artist_name = f"synthetic {size}x{words_per_line}"
+                artist_data = synthetic.make_artist_data(size, words_per_line=words_per_line, vocabulary=vocabulary, seed=size)
+                result = bench_corpus(artist_name, artist_data, vocabulary, repeat)
+                result['words_per_line'] = words_per_line
+                corpora.append(result)
+                main.loaded_artists.clear()
+        fetch = bench_fetch(fetch_songs, latency, workers, requests_per_second) if fetch_songs else None
+        update = bench_update(fetch_songs, UPDATE_NEW_SONGS, latency, workers, requests_per_second) if fetch_songs else None
+    finally:
+        use_data_dir(data_dir_before, resolved_artists_before)
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'corpora': corpora,
+        'fetch': fetch,
+        'update': update,
+    }
+
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark search, cache loading and ingest on synthetic artists.")
+    parser.add_argument('--sizes', default='50,500,5000', help="songs per synthetic artist, comma separated")
+    parser.add_argument('--line-words', default='4,8,16', help="average words per line, comma separated")
+    parser.add_argument('--repeat', type=int, default=20, help="runs per search word")
+    parser.add_argument('--fetch-songs', type=int, default=200, help="songs ingested through the fake client, 0 to skip")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds the fake client sleeps per call")
+    parser.add_argument('--workers', type=int, default=main.FETCH_WORKERS)
+    parser.add_argument('--requests-per-second', type=float, default=1000)
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # library diagnostics go to stderr, stdout only carries the report
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run([int(size) for size in args.sizes.split(',')],
+                     [int(words) for words in args.line_words.split(',')],
+                     args.repeat, args.fetch_songs, args.latency, args.workers, args.requests_per_second)
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    run_cli()
@@ -0,0 +1,120 @@
+import json
+import html
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# local stand-in for the Genius API and its lyrics pages, serving a synthetic artist (see
+# synthetic.make_artist_data) over HTTP for the asyncio ingest: pass `url` as its api_root.
+#
+#   GET /search?q=A                     the artist as the primary artist of a song hit
+#   GET /artists/<id>/songs?page=N      the listing by title, per_page songs a page
+#   GET /songs/<id>                     a song with its metadata
+#   GET /lyrics/<id>                    a song page with data-lyrics-container divs
+#
+# fail() makes the next requests to a path answer with an error status instead, and every
+# request is logged as (time, path, status) in `requests`
+class StubGenius:
+    def __init__(self, artist_data, host='127.0.0.1', port=0):
+        self.artist_data = artist_data
+        self.songs = {song['id']: song for song in artist_data['songs']}
+        self.lock = threading.Lock()
+        self.failures = {}  # path -> [(status, headers), ...] still to answer
+        self.requests = []
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # the next `times` requests to path (e.g. '/artists/1/songs') fail with status
+    def fail(self, path, status, times=1, retry_after=None):
+        headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+        with self.lock:
+            self.failures.setdefault(path, []).extend([(status, headers)] * times)
+
+    # the paths requested, in order
+    def paths(self):
+        with self.lock:
+            return [path for _, path, _ in self.requests]
+
+    def song_url(self, song_id):
+        return f"{self.url}/lyrics/{song_id}"
+
+    # one page of the listing, as the API answers it
+    def listing(self, page=1, per_page=20):
+        songs = sorted(self.artist_data['songs'], key=lambda song: song['title'])
+        start = (page - 1) * per_page
+        listing = [{'id': song['id'], 'title': song['title'], 'url': self.song_url(song['id'])}
+                   for song in songs[start:start + per_page]]
+        return {'songs': listing, 'next_page': page + 1 if start + per_page < len(songs) else None}
+
+    def _song(self, song_id):
+        song = self.songs[song_id]
+        return {'song': {'id': song['id'], 'title': song['title'], 'url': self.song_url(song['id']),
+                         'release_date': None, 'album': None, 'featured_artists': []}}
+
+    def _lyrics_page(self, song_id):
+        lines = '<br/>'.join(html.escape(line) for line in self.songs[song_id]['lyrics'].split('\n'))
+        return f'<html><body><div data-lyrics-container="true">{lines}</div></body></html>'
+
+    # (status, headers, body) of a request
+    def respond(self, path, params):
+        with self.lock:
+            failures = self.failures.get(path)
+            failure = failures.pop(0) if failures else None
+        if failure is not None:
+            status, headers = failure
+            return status, dict(headers), {'error': 'stub failure'}
+        parts = path.strip('/').split('/')
+        artist = self.artist_data['artist']
+        if parts == ['search']:
+            return 200, {}, {'response': {'hits': [{'type': 'song', 'result': {'primary_artist': artist}}]}}
+        if len(parts) == 3 and parts[0] == 'artists' and parts[2] == 'songs' and parts[1] == str(artist['id']):
+            return 200, {}, {'response': self.listing(int(params.get('page', 1)), int(params.get('per_page', 20)))}
+        if len(parts) == 2 and parts[0] in ('songs', 'lyrics') and parts[1].isdigit() and int(parts[1]) in self.songs:
+            if parts[0] == 'songs':
+                return 200, {}, {'response': self._song(int(parts[1]))}
+            return 200, {'Content-Type': 'text/html; charset=utf-8'}, self._lyrics_page(int(parts[1]))
+        return 404, {}, {'error': 'not found'}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                status, headers, body = stub.respond(url.path, params)
+                with stub.lock:
+                    stub.requests.append((time.monotonic(), url.path, status))
+                data = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+                self.send_response(status)
+                headers.setdefault('Content-Type', 'application/json')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,91 @@
+import time
+import random
+import threading
+
+# synthetic artists for the benchmarks: Zipf-distributed made-up words, so a few
+# words are in most lines and most words are rare, like real lyrics
+SYLLABLES = ['la', 'na', 'ka', 'mo', 'ri', 'to', 'be', 'so', 'lu', 've', 'da', 'ne', 'shi', 'yo', 'ha', 'ba']
+SECTIONS = ['[Verse 1]', '[Chorus]', '[Verse 2]', '[Bridge]', '[Outro]']
+
+def make_vocabulary(size=2000, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+    # most frequent first
+    return sorted(words, key=lambda word: (len(word), word))
+
+# {'artist', 'songs'} like a saved cache, deterministic for a given seed
+def make_artist_data(song_count, lines_per_song=40, words_per_line=8, vocabulary=None, seed=0):
+    rng = random.Random(seed)
+    vocabulary = vocabulary or make_vocabulary(seed=seed)
+    cum_weights = []
+    total = 0.0
+    for rank in range(len(vocabulary)):
+        total += 1 / (rank + 1)
+        cum_weights.append(total)
+
+    songs = []
+    # Genius ids start at 1, the ingest treats a falsy id as missing
+    for song_id in range(1, song_count + 1):
+        lines = []
+        for line_number in range(lines_per_song):
+            if line_number % 8 == 0:
+                lines.append(SECTIONS[(line_number // 8) % len(SECTIONS)])
+                continue
+            length = max(1, int(rng.gauss(words_per_line, words_per_line / 4)))
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=length)
+            lines.append(' '.join(words).capitalize())
+        songs.append({
+            'id': song_id,
+            'title': f"Song {song_id} {rng.choice(vocabulary).title()}",
+            'url': f"https://genius.invalid/songs/{song_id}",
+            'lyrics': '\n'.join(lines),
+        })
+    artist = {'id': 1, 'name': f"Synthetic {song_count}", 'image_url': None}
+    return {'artist': artist, 'songs': songs}
+
+# stands in for lyricsgenius.Genius in the fetch benchmark: serves a synthetic artist,
+# sleeping `latency` seconds per call, and counts the calls made
+class FakeGenius:
+    def __init__(self, artist_data, latency=0.05):
+        self.artist_data = artist_data
+        self.songs = {song['id']: song for song in artist_data['songs']}
+        self.urls = {song['url']: song for song in artist_data['songs']}
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def _call(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def search_artist(self, artist_name, max_songs=None, get_full_info=True):
+        self._call('search_artist')
+        artist = self.artist_data['artist']
+        return type('Artist', (), {'id': artist['id'], 'name': artist['name'], 'image_url': artist['image_url']})()
+
+    # sorted like the API: by title, or newest first by release date, the higher
+    # synthetic ids being the more recent songs
+    def artist_songs(self, artist_id, page=1, per_page=50, sort='title'):
+        self._call('artist_songs')
+        songs = self.artist_data['songs']
+        if sort == 'release_date':
+            songs = sorted(songs, key=lambda song: song['id'], reverse=True)
+        elif sort == 'title':
+            songs = sorted(songs, key=lambda song: song['title'])
+        start = (page - 1) * per_page
+        listing = [{'id': song['id'], 'title': song['title'], 'url': song['url']} for song in songs[start:start + per_page]]
+        next_page = page + 1 if start + per_page < len(songs) else None
+        return {'songs': listing, 'next_page': next_page}
+
+    def song(self, song_id):
+        self._call('song')
+        song = self.songs[song_id]
+        return {'song': {'id': song['id'], 'title': song['title'], 'url': song['url']}}
+
+    def lyrics(self, song_url=None, **kwargs):
+        self._call('lyrics')
+        return self.urls[song_url]['lyrics']
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import threading
+import weakref
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+import lyrics_index
+
+# columnar, memory-mappable copy of an artist's _lyrics.json cache (<artist>_lyrics.lfb):
+#
+#   'LFB1' | meta length (uint32) | meta JSON | padding to 8 bytes
+#   song_starts          uint32 x (songs + 1)   first line id of each song
+#   display_offsets      uint64 x (lines + 1)   file offset of each display line
+#   normalized_offsets   uint64 x (lines + 1)   file offset of each normalized line
+#   display lines        utf-8, joined by '\n'
+#   normalized lines     utf-8, joined by '\n'
+#
+# the meta JSON holds the artist, every song's fields except its lyrics, and the size/mtime
+# of the JSON cache it was built from. searches run find() over the mapped normalized
+# bytes and only decode the lines that match
+MAGIC = b'LFB1'
+HEADER = struct.Struct('<4sI')
+FORMAT_VERSION = 1
+
+# open mappings per .lfb file, so they can be closed before the file is replaced on Windows,
+# which refuses to replace a file that is still mapped. elsewhere the old mapping stays
+# readable after the replace and is released once nothing uses it anymore
+_open_stores = {}
+_stores_lock = threading.Lock()
+
+def binary_file_for(data_file):
+    return os.path.splitext(data_file)[0] + '.lfb'
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+def _line_offsets(lines, start):
+    offsets = array('Q', [start])
+    for line in lines:
+        start += len(line.encode('utf-8')) + 1
+        offsets.append(start)
+    return offsets
+
+# writes the binary copy of artist_data next to its JSON cache
+def write_binary(artist_data, data_file):
+    corpus = lyrics_index.get_corpus(artist_data)
+    songs = artist_data.get('songs', [])
+    song_meta = []
+    for song in songs:
+        meta = {key: value for key, value in song.items() if key != 'lyrics'}
+        if not song.get('lyrics'):
+            meta['lyrics'] = song.get('lyrics')
+        song_meta.append(meta)
+
+    display_blob = '\n'.join(corpus.display_lines).encode('utf-8')
+    normalized_blob = corpus.blob.encode('utf-8')
+    line_count = len(corpus.lines)
+    meta = {
+        'version': FORMAT_VERSION,
+        'source': list(lyrics_index.source_stamp(data_file)),
+        'artist': artist_data.get('artist', {}),
+        'songs': song_meta,
+        'lines': line_count,
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    song_starts_at = _align(HEADER.size + len(meta_bytes))
+    display_offsets_at = _align(song_starts_at + 4 * (len(songs) + 1))
+    normalized_offsets_at = display_offsets_at + 8 * (line_count + 1)
+    display_at = normalized_offsets_at + 8 * (line_count + 1)
+    normalized_at = display_at + len(display_blob) + 1
+
+    binary_file = binary_file_for(data_file)
+    tmp_file = binary_file + '.tmp'
+    with open(tmp_file, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(meta_bytes)))
+        file.write(meta_bytes)
+        file.write(b'\0' * (song_starts_at - file.tell()))
+        file.write(corpus.song_starts.tobytes())
+        file.write(b'\0' * (display_offsets_at - file.tell()))
+        file.write(_line_offsets(corpus.display_lines, display_at).tobytes())
+        file.write(_line_offsets(corpus.lines, normalized_at).tobytes())
+        file.write(display_blob + b'\n')
+        file.write(normalized_blob + b'\n')
+    if os.name == 'nt':
+        close_mappings(binary_file)
+    os.replace(tmp_file, binary_file)
+    return binary_file
+
+# closes every mapping of a .lfb file opened by this process; data loaded from them
+# can't be searched afterwards, so this is only for replacing the file on Windows
+def close_mappings(binary_file):
+    with _stores_lock:
+        stores = list(_open_stores.pop(os.path.abspath(binary_file), ()))
+    for store in stores:
+        store.close()
+
+# releases the views into a mapping, then the mapping, which can't close while they exist
+def _unmap(mm, views):
+    for view in views:
+        view.release()
+    mm.close()
+
+# a memory-mapped .lfb file, unmapped by close() or once the store is garbage collected
+class MappedStore:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.views = []
+        with open(path, 'rb') as file:
+            self.mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, meta_len = HEADER.unpack_from(self.mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a lyrics binary cache")
+            self.meta = json.loads(self.mm[HEADER.size:HEADER.size + meta_len].decode('utf-8'))
+            song_count = len(self.meta['songs'])
+            line_count = self.meta['lines']
+            song_starts_at = _align(HEADER.size + meta_len)
+            display_offsets_at = _align(song_starts_at + 4 * (song_count + 1))
+            normalized_offsets_at = display_offsets_at + 8 * (line_count + 1)
+            view = memoryview(self.mm)
+            self.song_starts = view[song_starts_at:song_starts_at + 4 * (song_count + 1)].cast('I')
+            self.display_offsets = view[display_offsets_at:normalized_offsets_at].cast('Q')
+            self.normalized_offsets = view[normalized_offsets_at:normalized_offsets_at + 8 * (line_count + 1)].cast('Q')
+            self.views = [self.song_starts, self.display_offsets, self.normalized_offsets, view]
+        except Exception:
+            _unmap(self.mm, self.views)
+            raise
+        self._finalizer = weakref.finalize(self, _unmap, self.mm, self.views)
+        with _stores_lock:
+            _open_stores.setdefault(self.path, weakref.WeakSet()).add(self)
+
+    # unmaps the file now; only for stores nothing else is reading
+    def close(self):
+        self._finalizer()
+
+    def display_line(self, line_id):
+        return self.mm[self.display_offsets[line_id]:self.display_offsets[line_id + 1] - 1].decode('utf-8')
+
+    def normalized_line(self, line_id):
+        return self.mm[self.normalized_offsets[line_id]:self.normalized_offsets[line_id + 1] - 1].decode('utf-8')
+
+# the songs of a mapped cache as a read-only list, each song decoded when accessed
+class MappedSongs(Sequence):
+    def __init__(self, store):
+        self.store = store
+        self.corpus = MappedCorpus(store)
+
+    def close(self):
+        self.store.close()
+
+    def __len__(self):
+        return len(self.store.meta['songs'])
+
+    def __getitem__(self, song_idx):
+        if isinstance(song_idx, slice):
+            return [self[i] for i in range(*song_idx.indices(len(self)))]
+        store = self.store
+        song = dict(store.meta['songs'][song_idx])
+        if 'lyrics' not in song:
+            start = store.display_offsets[store.song_starts[song_idx]]
+            end = store.display_offsets[store.song_starts[song_idx + 1]] - 1
+            song['lyrics'] = store.mm[start:end].decode('utf-8')
+        return song
+
+# normalized lines of a mapped cache, decoded one at a time
+class _NormalizedLines(Sequence):
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.meta['lines']
+
+    def __getitem__(self, line_id):
+        return self.store.normalized_line(line_id)
+
+# LyricsCorpus over a mapped cache: the scan runs on the mapped utf-8 bytes, which match
+# exactly where the decoded strings would, so no Python object is built per song or line
+class MappedCorpus:
+    def __init__(self, store):
+        self.store = store
+        self.titles = [song.get('title') for song in store.meta['songs']]
+        self.song_starts = store.song_starts
+        self.lines = _NormalizedLines(store)
+        self._joined = None
+
+    # memory outside the mapping: the parsed song metadata, titles and decoded lines if built
+    def memory_bytes(self):
+        total = lyrics_index.songs_bytes(self.store.meta['songs']) + sys.getsizeof(self.titles)
+        if self._joined is not None:
+            total += sum(map(sys.getsizeof, self._joined))
+        return total
+
+    # the normalized lines decoded into one string, with the offset each line starts at,
+    # for the matchers that need text rather than bytes
+    def joined_lines(self):
+        if self._joined is None:
+            line_count = len(self.lines)
+            offsets = self.store.normalized_offsets
+            lines = []
+            if line_count:
+                lines = self.store.mm[offsets[0]:offsets[line_count] - 1].decode('utf-8').split('\n')
+            self._joined = lyrics_index.join_lines(lines)
+        return self._joined
+
+    def scan(self, word):
+        return list(self.iter_scan(word))
+
+    def iter_scan(self, word):
+        line_count = len(self.lines)
+        if not word:
+            yield from range(line_count)
+            return
+        if '\n' in word:
+            return
+        needle = word.encode('utf-8')
+        mm = self.store.mm
+        offsets = self.store.normalized_offsets
+        end = offsets[line_count]
+        pos = mm.find(needle, offsets[0], end)
+        while pos != -1:
+            line_id = bisect_right(offsets, pos) - 1
+            yield line_id
+            pos = mm.find(needle, offsets[line_id + 1], end)
+
+    def group(self, line_ids):
+        return list(self.iter_group(line_ids))
+
+    def iter_group(self, line_ids):
+        current_song = None
+        matching_lines = []
+        for line_id in line_ids:
+            # songs without lyrics own no lines, so bisect_right skips past them
+            song_idx = bisect_right(self.song_starts, line_id) - 1
+            if song_idx != current_song:
+                if current_song is not None:
+                    yield self.titles[current_song], matching_lines
+                current_song = song_idx
+                matching_lines = []
+            matching_lines.append(self.store.display_line(line_id))
+        if current_song is not None:
+            yield self.titles[current_song], matching_lines
+
+    # same results as LyricsCorpus.search; the byte scan is already fast enough that
+    # the trigram index is not built here
+    def search(self, word, index=None, trigrams=None):
+        return list(self.iter_search(word, index, trigrams))
+
+    def iter_search(self, word, index=None, trigrams=None):
+        line_ids = None
+        if index is not None and len(word) < 3:
+            line_ids = lyrics_index.search_index(word, self, index)
+        if line_ids is None:
+            return self.iter_group(self.iter_scan(word))
+        return self.iter_group(line_ids)
+
+# the artist data of a binary cache, None if it is missing or older than its JSON cache
+def load_binary(data_file):
+    binary_file = binary_file_for(data_file)
+    if not os.path.exists(binary_file):
+        return None
+    try:
+        store = MappedStore(binary_file)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read {binary_file}: {e}")
+        return None
+    try:
+        source = lyrics_index.source_stamp(data_file)
+    except OSError as e:
+        store.close()
+        print(f"Warning: could not read {binary_file}: {e}")
+        return None
+    if store.meta.get('version') != FORMAT_VERSION or store.meta.get('source') != list(source):
+        store.close()
+        return None
+    return lyrics_index.ArtistData({'artist': store.meta['artist'], 'songs': MappedSongs(store)})
+
+# builds the binary copy of every JSON cache in data_dir that lacks a current one
+def migrate_data_dir(data_dir):
+    migrated = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith('_lyrics.json'):
+            continue
+        data_file = os.path.join(data_dir, name)
+        current = load_binary(data_file)
+        if current is not None:
+            current.close()
+            continue
+        try:
+            with open(data_file, 'r', encoding='utf-8') as file:
+                artist_data = json.load(file)
+            migrated.append(write_binary(artist_data, data_file))
+        except (OSError, ValueError) as e:
+            print(f"Error migrating {data_file}: {e}")
+    return migrated
@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import threading
+import lyrics_index
+
+# small manifest of the saved artists (data/catalog.json), so listing them
+# doesn't mean parsing every lyrics file
+CATALOG_VERSION = 1
+CATALOG_NAME = 'catalog.json'
+
+_lock = threading.Lock()
+
+def catalog_file(data_dir):
+    return os.path.join(data_dir, CATALOG_NAME)
+
+def _load(data_dir):
+    try:
+        with open(catalog_file(data_dir), 'r', encoding='utf-8') as file:
+            catalog = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if catalog.get('version') != CATALOG_VERSION:
+        return {}
+    return catalog.get('artists', {})
+
+def _save(data_dir, artists):
+    path = catalog_file(data_dir)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as file:
+        json.dump({'version': CATALOG_VERSION, 'artists': artists}, file, ensure_ascii=False, indent=1)
+    os.replace(tmp_file, path)
+
+def _entry(artist_key, artist_data, data_file, updated=None):
+    stat = os.stat(data_file)
+    artist_info = artist_data.get('artist', {})
+    return {
+        'key': artist_key,
+        'name': artist_info.get('name') or artist_key,
+        'image_url': artist_info.get('image_url'),
+        'songs': len(artist_data.get('songs', [])),
+        'updated': updated or stat.st_mtime,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'index_version': lyrics_index.INDEX_VERSION,
+    }
+
+def _is_current(entry, data_file):
+    try:
+        stat = os.stat(data_file)
+    except OSError:
+        return False
+    return entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns
+
+# records an artist right after its cache file was written
+def update_entry(data_dir, artist_key, artist_data, data_file):
+    with _lock:
+        artists = _load(data_dir)
+        artists[artist_key] = _entry(artist_key, artist_data, data_file, updated=time.time())
+        _save(data_dir, artists)
+
+# catalog entries of every saved artist, in file name order. files the catalog doesn't
+# know yet, or that changed behind its back, are parsed once and recorded
+def list_artists(data_dir):
+    with _lock:
+        artists = _load(data_dir)
+        changed = False
+        entries = []
+        names = sorted(f for f in os.listdir(data_dir) if f.endswith('_lyrics.json'))
+        keys = set()
+        for name in names:
+            artist_key = name[:-len('_lyrics.json')]
+            data_file = os.path.join(data_dir, name)
+            keys.add(artist_key)
+            entry = artists.get(artist_key)
+            if entry is None or not _is_current(entry, data_file):
+                try:
+                    with open(data_file, 'r', encoding='utf-8') as file:
+                        entry = _entry(artist_key, json.load(file), data_file)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading {data_file}: {e}")
+                    continue
+                artists[artist_key] = entry
+                changed = True
+            entries.append(entry)
+        for artist_key in set(artists) - keys:
+            del artists[artist_key]
+            changed = True
+        if changed:
+            try:
+                _save(data_dir, artists)
+            except OSError as e:
+                print(f"Warning: could not write the artist catalog: {e}")
+        return entries
@@ -0,0 +1,208 @@
+import threading
+import time
+import random
+import email.utils
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import metrics
+
+try:
+    # comes with lyricsgenius, whose own HTTPError is this one raised as HTTPError(status, message)
+    from requests import HTTPError
+except ImportError:
+    HTTPError = None
+
+# HTTP statuses worth another try: timeouts, rate limiting and server side hiccups
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# token bucket: `rate` requests per second on average, with bursts of up to `capacity`
+# requests after an idle period. the rate adapts (AIMD): every success adds `increase`
+# up to max_rate, every throttled response halves it down to min_rate.
+# only the bookkeeping, RateLimiter and genius_async.AsyncRateLimiter do the waiting
+class TokenBucket:
+    def __init__(self, rate, capacity=None, max_rate=None, min_rate=None, increase=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.min_rate = float(min_rate if min_rate is not None else self.rate / 10)
+        # back from min_rate to max_rate in about 100 successful requests
+        self.increase = increase if increase is not None else self.max_rate / 100
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.requests = 0  # requests let through, what the download cost in API calls
+
+    # takes a token for one request: 0 if it may go now, else the seconds until it may
+    def take(self):
+        if self.rate <= 0:
+            self.requests += 1
+            return 0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.requests += 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def succeeded(self):
+        if self.rate > 0:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    # slows down after a 429; a Retry-After pause holds back every request sharing the bucket
+    def throttled(self, pause=None):
+        if self.rate > 0:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if pause:
+                self.tokens = min(self.tokens, 1 - pause * self.rate)
+        metrics.count('ratelimit.throttled')
+
+# token bucket shared by every worker thread of a download
+class RateLimiter(TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+
+    # blocks until a request may be sent
+    def acquire(self):
+        while True:
+            with self.lock:
+                wait = self.take()
+            if not wait:
+                return
+            metrics.observe('ratelimit.wait', wait)
+            time.sleep(wait)
+
+    def succeeded(self):
+        with self.lock:
+            super().succeeded()
+
+    def throttled(self, pause=None):
+        with self.lock:
+            super().throttled(pause)
+
+# HTTP status of a failed request, from requests/lyricsgenius or aiohttp errors
+def error_status(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None) or getattr(error, 'status', None)
+    # lyricsgenius raises HTTPError(status_code, message) without a response; any other
+    # OSError carries its errno there, e.g. 104 for a connection reset
+    if status is None and HTTPError is not None and isinstance(error, HTTPError) \
+            and error.args and isinstance(error.args[0], int):
+        status = error.args[0]
+    return status
+
+# seconds the server asked us to wait (Retry-After as seconds or an HTTP date), None if it didn't
+def retry_after(error):
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or getattr(error, 'headers', None)
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# keeps the last response each thread got through a requests session, for clients such as
+# lyricsgenius that raise their own HTTPError without it. attach() hands a failed response
+# to the error so error_status and retry_after can read its status and Retry-After header
+class ResponseRecorder:
+    def __init__(self, session):
+        self.local = threading.local()
+        session.hooks['response'].append(self._record)
+
+    def _record(self, response, *args, **kwargs):
+        self.local.response = response
+
+    # forgets this thread's last response, call before each request
+    def clear(self):
+        self.local.response = None
+
+    def attach(self, error):
+        response = getattr(self.local, 'response', None)
+        if response is None or getattr(error, 'response', None) is not None or response.status_code < 400:
+            return
+        try:
+            error.response = response
+        except AttributeError:
+            pass
+
+# retries transient failures with exponential backoff and full jitter, or after the
+# server's Retry-After. network_errors are the exception types retried when there
+# is no HTTP status to go by
+class RetryPolicy:
+    def __init__(self, retries=5, base_delay=1.0, max_delay=60.0, network_errors=(OSError,)):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.network_errors = network_errors
+
+    def is_transient(self, error):
+        status = error_status(error)
+        if status is not None:
+            return status in RETRY_STATUSES
+        return isinstance(error, self.network_errors)
+
+    # seconds to wait before retry number `attempt` (0 for the first retry)
+    def delay(self, attempt, error=None):
+        server_delay = retry_after(error) if error is not None else None
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # seconds to wait before retrying after attempt number `attempt` failed with the
+    # error, None if it should be raised instead. after a 429 the limiter, when given,
+    # holds every worker back instead of this one sleeping
+    def backoff(self, error, attempt, limiter=None):
+        if attempt >= self.retries or not self.is_transient(error):
+            return None
+        wait = self.delay(attempt, error)
+        if limiter and error_status(error) == 429:
+            limiter.throttled(wait)
+            wait = 0
+        metrics.count('api.retries')
+        return wait
+
+    # fn() until it succeeds, a non-transient error or the retries run out.
+    # paced by the limiter when given, which is told how each attempt went
+    def call(self, fn, limiter=None):
+        attempt = 0
+        while True:
+            if limiter:
+                limiter.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                wait = self.backoff(e, attempt, limiter)
+                if wait is None:
+                    raise
+                attempt += 1
+                if wait:
+                    time.sleep(wait)
+                continue
+            if limiter:
+                limiter.succeeded()
+            return result
+
+# runs fetch(item) for every item on a bounded pool of workers.
+# results come back in input order; progress_callback(done, total) is called from
+# the calling thread as each item finishes, like the sequential loop did
+def fetch_all(items, fetch, workers=8, progress_callback=None):
+    total = len(items)
+    results = [None] * total
+    if workers <= 1:
+        for idx, item in enumerate(items):
+            results[idx] = fetch(item)
+            if progress_callback:
+                progress_callback(idx + 1, total)
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, item): idx for idx, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(done, total)
+    return results
@@ -0,0 +1,150 @@
+import asyncio
+from html.parser import HTMLParser
+import metrics
+import downloader
+
+try:
+    import aiohttp
+except ImportError:  # only needed for the asyncio ingest path
+    aiohttp = None
+
+API_ROOT = 'https://api.genius.com'
+
+# asyncio version of downloader.RateLimiter, shared by every coroutine of a session.
+# only touched from the event loop, so the bucket needs no thread lock
+class AsyncRateLimiter(downloader.TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                wait = self.take()
+                if not wait:
+                    return
+                metrics.observe('ratelimit.wait', wait)
+                await asyncio.sleep(wait)
+
+# pulls the text out of the data-lyrics-container divs of a Genius song page,
+# turning <br> into newlines like lyricsgenius does
+class LyricsParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.depth:
+            if tag == 'div':
+                self.depth += 1
+            elif tag == 'br':
+                self.parts.append('\n')
+        elif tag == 'div' and ('data-lyrics-container', 'true') in attrs:
+            if self.parts:
+                self.parts.append('\n')
+            self.depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self.depth and tag == 'br':
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if self.depth and tag == 'div':
+            self.depth -= 1
+
+    def handle_data(self, data):
+        if self.depth:
+            self.parts.append(data)
+
+    def lyrics(self):
+        return ''.join(self.parts).strip('\n') or None
+
+# one pooled keep-alive HTTP session for the Genius API and lyrics pages,
+# with bounded concurrency, a shared adaptive rate limit and retries of transient failures
+class GeniusSession:
+    def __init__(self, token, api_root=None, workers=8, requests_per_second=5, timeout=120,
+                 max_requests_per_second=None, retry_policy=None):
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the asyncio ingest path (pip install aiohttp)")
+        self.token = token
+        self.api_root = (api_root or API_ROOT).rstrip('/')
+        self.workers = workers
+        self.limiter = AsyncRateLimiter(requests_per_second, max_rate=max_requests_per_second)
+        # same policy, with aiohttp's connection errors and timeouts retried as well as OS errors
+        policy = retry_policy or downloader.RetryPolicy()
+        self.retry_policy = downloader.RetryPolicy(policy.retries, policy.base_delay, policy.max_delay,
+                                                   (OSError, asyncio.TimeoutError, aiohttp.ClientConnectionError,
+                                                    aiohttp.ClientPayloadError))
+        self.timeout = timeout
+        self.session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.workers, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self.semaphore = asyncio.Semaphore(self.workers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    # one request, counted and timed under api.<method> like main.genius_call
+    async def _request(self, method, url, params=None, api=False):
+        headers = {'Authorization': f"Bearer {self.token}"} if api else None
+        async with self.semaphore:
+            await self.limiter.acquire()
+            metrics.count('api.requests')
+            metrics.count(f"api.requests.{method}")
+            with metrics.timed(f"api.{method}"):
+                try:
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        response.raise_for_status()
+                        if api:
+                            return (await response.json(content_type=None))['response']
+                        return await response.text()
+                except Exception:
+                    metrics.count('api.errors')
+                    raise
+
+    # the request retried like downloader.RetryPolicy.call, backing off outside the semaphore
+    async def _get(self, method, url, params=None, api=False):
+        attempt = 0
+        while True:
+            try:
+                result = await self._request(method, url, params, api)
+            except Exception as e:
+                wait = self.retry_policy.backoff(e, attempt, self.limiter)
+                if wait is None:
+                    raise
+                attempt += 1
+                if wait:
+                    await asyncio.sleep(wait)
+                continue
+            self.limiter.succeeded()
+            return result
+
+    # the best matching artist as {'id', 'name', 'image_url'}, None if not found
+    async def search_artist(self, artist_name):
+        response = await self._get('search_artist', f"{self.api_root}/search", {'q': artist_name}, api=True)
+        artists = [hit['result']['primary_artist'] for hit in response.get('hits', [])
+                   if hit.get('type', 'song') == 'song' and hit.get('result', {}).get('primary_artist')]
+        if not artists:
+            return None
+        for artist in artists:
+            if artist['name'].lower() == artist_name.lower():
+                return artist
+        return artists[0]
+
+    async def artist_songs(self, artist_id, page=1, per_page=50):
+        return await self._get('artist_songs', f"{self.api_root}/artists/{artist_id}/songs",
+                               {'page': page, 'per_page': per_page}, api=True)
+
+    async def song(self, song_id):
+        return await self._get('song', f"{self.api_root}/songs/{song_id}", api=True)
+
+    async def lyrics(self, song_url):
+        parser = LyricsParser()
+        parser.feed(await self._get('lyrics', song_url))
+        return parser.lyrics()
@@ -7,9 +7,10 @@ import webbrowser
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import main
 from tkinter import messagebox
-from interface import SecondPage, LoadingPage, SavedArtistsPage
+from interface import SecondPage, LoadingPage, SavedArtistsPage, page_masks
 
 fields = ['artist', 'word']  # fields for text inputs
+ALL_ARTISTS = main.ALL_ARTISTS  # artist entry that searches every saved artist
 
 class State:
     def __init__(self):
@@ -125,16 +126,24 @@ def on_search(event=None):
         return
     show_loading_image()
 
+    # "*" searches every saved artist at once
+    if artist_name == ALL_ARTISTS:
+        def do_search_all():
+            result = main.search_word_in_all_artists(search_word)
+            root.after(0, lambda: [hide_loading_image(), hide_first_screen(), SecondPage.show_second_page(root, result, {'artist': {}}, search_word, on_back)])
+        threading.Thread(target=do_search_all).start()
+        return
+
     # threaded function to get data and show results
     def do_search(): 
         data_file = os.path.join(main.data_dir, f"{artist_name}_lyrics.json")
         if os.path.exists(data_file):
             artist_data = main.get_artist_data_with_progress(artist_name)
             if artist_data:
-                result = main.search_word_in_lyrics(search_word, artist_data, artist_name)
+                result = SecondPage.start_streamed_result(main.iter_search_word_in_lyrics(search_word, artist_data, artist_name))
             else:
                 result = [(f"Artist '{artist_name}' not found.", [])]
-            root.after(0, lambda: [hide_loading_image(), hide_first_screen(), SecondPage.show_second_page(root, result, artist_data, search_word, on_back)])
+            root.after(0, lambda: [hide_loading_image(), hide_first_screen(), SecondPage.show_second_page(root, result, artist_data, search_word, on_back, artist_name)])
         else:
             root.after(0, lambda: [hide_loading_image(), hide_first_screen(), LoadingPage.show_loading_page(root, artist_name, search_word, on_back)])
 
@@ -183,67 +192,77 @@ def open_saved_artists():
     show_loading_image()
     root.after(1000, lambda: [hide_loading_image(), hide_first_screen(), SavedArtistsPage.show_saved_artists_page(root, on_back)])
 
-root = tk.Tk()  # main window
-root.title("LF Lyrics Finder")
-root.geometry("750x750")
-root.resizable(False, False)
+# the window is only built when run directly, not when a search worker process re-imports this module
+if __name__ == '__main__':
+    root = tk.Tk()  # main window
+    root.title("LF Lyrics Finder")
+    root.geometry("750x750")
+    root.resizable(False, False)
+
+    icon_path = os.path.join(os.path.dirname(__file__), 'assets', 'Icon64bits.ico')
+    root.iconbitmap(icon_path)
 
-icon_path = os.path.join(os.path.dirname(__file__), 'assets', 'Icon64bits.ico')
-root.iconbitmap(icon_path)
+    asset_path = os.path.join(os.path.dirname(__file__), 'assets', 'FirstPage.png')
+    bg_image = Image.open(asset_path)
+    bg_photo = ImageTk.PhotoImage(bg_image)
 
-asset_path = os.path.join(os.path.dirname(__file__), 'assets', 'FirstPage.png')
-bg_image = Image.open(asset_path)
-bg_photo = ImageTk.PhotoImage(bg_image)
+    canvas = tk.Canvas(root, width=750, height=750, takefocus=True)
+    canvas.pack(fill="both", expand=True)
+    canvas.create_image(0, 0, image=bg_photo, anchor="nw")
+    canvas.image = bg_photo
 
-canvas = tk.Canvas(root, width=750, height=750, takefocus=True)
-canvas.pack(fill="both", expand=True)
-canvas.create_image(0, 0, image=bg_photo, anchor="nw")
-canvas.image = bg_photo
+    entry_coords = {
+        'artist': (210, 240, 610, 290),
+        'word': (200, 378, 610, 428)
+    }
 
-entry_coords = {
-    'artist': (210, 240, 610, 290),
-    'word': (200, 378, 610, 428)
-}
+    entry_areas = {}
+    text_items = {}
+    cursor_items = {}
+    text_font = ("Comic Sans MS", 26)
 
-entry_areas = {}
-text_items = {}
-cursor_items = {}
-text_font = ("Comic Sans MS", 26)
+    for entry in fields:
+        x1, y1, x2, y2 = entry_coords[entry]
+        entry_area = canvas.create_rectangle(x1, y1, x2, y2, fill="", outline="")
+        canvas.tag_bind(entry_area, "<Button-1>", lambda e, ent=entry: focus_entry(ent))
+        entry_areas[entry] = entry_area
 
-for entry in fields:
-    x1, y1, x2, y2 = entry_coords[entry]
-    entry_area = canvas.create_rectangle(x1, y1, x2, y2, fill="", outline="")
-    canvas.tag_bind(entry_area, "<Button-1>", lambda e, ent=entry: focus_entry(ent))
-    entry_areas[entry] = entry_area
+        text_item = canvas.create_text(x1+5, y1+5, anchor="nw", text="", font=text_font, fill="black")
+        text_items[entry] = text_item
 
-    text_item = canvas.create_text(x1+5, y1+5, anchor="nw", text="", font=text_font, fill="black")
-    text_items[entry] = text_item
+        cursor_item = canvas.create_line(x1+5, y1+5, x1+5, y1+35, fill="black", width=2)
+        canvas.itemconfigure(cursor_item, state='hidden')
+        cursor_items[entry] = cursor_item
 
-    cursor_item = canvas.create_line(x1+5, y1+5, x1+5, y1+35, fill="black", width=2)
-    canvas.itemconfigure(cursor_item, state='hidden')
-    cursor_items[entry] = cursor_item
+    # bind keys to the canvas
+    canvas.bind("<Key>", on_key_press)
+    canvas.bind("<Tab>", on_tab_press)
 
-# bind keys to the canvas
-canvas.bind("<Key>", on_key_press)
-canvas.bind("<Tab>", on_tab_press)
+    canvas.focus_set()
+    toggle_cursor()
 
-canvas.focus_set()
-toggle_cursor()
+    # green masks of the other pages are ready before the first page transition
+    assets_dir = os.path.join(os.path.dirname(__file__), 'assets')
+    threading.Thread(target=page_masks.preload, args=([
+        (os.path.join(assets_dir, 'LoadingPage.png'), None),
+        (os.path.join(assets_dir, 'SecondPage.png'), None),
+        (os.path.join(assets_dir, 'SavedArtistsPage.png'), None),
+        (os.path.join(assets_dir, 'SavedArtistsPage.png'), SavedArtistsPage.ARTIST_BLOCK_COORDS),
+    ],), daemon=True).start()
 
-search_area = canvas.create_rectangle(260, 450, 550, 550, fill="", outline="")
-canvas.tag_bind(search_area, "<Button-1>", on_search)
+    search_area = canvas.create_rectangle(260, 450, 550, 550, fill="", outline="")
+    canvas.tag_bind(search_area, "<Button-1>", on_search)
 
-saved_artists_area = canvas.create_rectangle(0, 590, 200, 790, fill="", outline="")
-canvas.tag_bind(saved_artists_area, "<Button-1>", lambda e: open_saved_artists())
+    saved_artists_area = canvas.create_rectangle(0, 590, 200, 790, fill="", outline="")
+    canvas.tag_bind(saved_artists_area, "<Button-1>", lambda e: open_saved_artists())
 
-history_logs_area = canvas.create_rectangle(580, 590, 830, 790, fill="", outline="")
-canvas.tag_bind(history_logs_area, "<Button-1>", lambda e: messagebox.showinfo("Info", "Not implemented yet.")) #to do
+    history_logs_area = canvas.create_rectangle(580, 590, 830, 790, fill="", outline="")
+    canvas.tag_bind(history_logs_area, "<Button-1>", lambda e: messagebox.showinfo("Info", "Not implemented yet.")) #to do
 
-github_area = canvas.create_rectangle(300, 690, 380, 750, fill="", outline="")
-canvas.tag_bind(github_area, "<Button-1>", open_github)
+    github_area = canvas.create_rectangle(300, 690, 380, 750, fill="", outline="")
+    canvas.tag_bind(github_area, "<Button-1>", open_github)
 
-website_area = canvas.create_rectangle(385, 690, 455, 750, fill="", outline="")
-canvas.tag_bind(website_area, "<Button-1>", open_website)
+    website_area = canvas.create_rectangle(385, 690, 455, 750, fill="", outline="")
+    canvas.tag_bind(website_area, "<Button-1>", open_website)
 
-if __name__ == '__main__':
     root.mainloop()
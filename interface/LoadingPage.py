@@ -2,31 +2,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
-import requests
-import io
 import threading
-import numpy as np
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import main
-from interface import SecondPage
+from interface import SecondPage, image_cache, page_masks
 
 # constants for styling and fonts
 FONT_ARTIST_NAME = ('Comic Sans MS', 40, 'bold')
 FONT_LOADING_TEXT = ('Comic Sans MS', 24)
 FONT_PROGRESS_TEXT = ('Comic Sans MS', 20)
 TEXT_COLOR = '#b057cc'
-GREEN_COLOR = (0, 255, 17)
-
-def fetch_artist_image(artist):
-    if artist and artist.image_url:
-        try:
-            response = requests.get(artist.image_url)
-            response.raise_for_status()
-            return Image.open(io.BytesIO(response.content))
-        except Exception as e:
-            print(f"Error loading artist image: {e}")
-    return None
 
 def paste_artist_image(bg_image_pil, mask, artist_image, bbox):
     if artist_image:
@@ -42,26 +28,22 @@ def show_loading_page(root, artist_name, search_word, on_back_callback, came_fro
     loading_screen.place(x=0, y=0)
 
     bg_image_path = os.path.join(os.path.dirname(__file__), 'assets', 'LoadingPage.png')
-    bg_image_pil = Image.open(bg_image_path).convert('RGB')
-
-    mask = Image.new('L', bg_image_pil.size, 0)
-    bg_array = np.array(bg_image_pil)
-    mask_array = np.all(bg_array == GREEN_COLOR, axis=-1).astype(np.uint8) * 255
-    mask = Image.fromarray(mask_array, mode='L')
-    bbox = mask.getbbox()
-
-    artist = main.genius.search_artist(artist_name, max_songs=1, get_full_info=False)
-    artist_image = fetch_artist_image(artist)
-
-    final_image_pil = paste_artist_image(bg_image_pil, mask, artist_image, bbox)
+    bg_image_pil, mask, bbox = page_masks.load_background(bg_image_path)
 
     loading_canvas = tk.Canvas(loading_screen, width=750, height=750)
     loading_canvas.pack(fill="both", expand=True)
 
-    final_image = ImageTk.PhotoImage(final_image_pil)
-    loading_canvas.create_image(0, 0, image=final_image, anchor='nw')
+    # the artist image is added by the loading thread once the artist is resolved
+    final_image = ImageTk.PhotoImage(bg_image_pil)
+    bg_item = loading_canvas.create_image(0, 0, image=final_image, anchor='nw')
     loading_canvas.final_image = final_image
 
+    def show_artist_image(final_image_pil):
+        if loading_screen.winfo_exists():
+            final_image = ImageTk.PhotoImage(final_image_pil)
+            loading_canvas.itemconfigure(bg_item, image=final_image)
+            loading_canvas.final_image = final_image
+
     # place artist name
     artist_x = 750 / 2
     artist_y = 195
@@ -102,6 +84,21 @@ def show_loading_page(root, artist_name, search_word, on_back_callback, came_fro
     def loading_thread():
         total_songs = [0]
 
+        # one cached lookup shared with the download below, composited once per artist image.
+        # without it the page just goes on without the image, the download reports the error
+        try:
+            artist_info = main.resolve_artist(artist_name)
+        except Exception as e:
+            print(f"Error resolving artist {artist_name}: {e}")
+            artist_info = None
+        final_image_pil = image_cache.get_composited(
+            artist_info.get('image_url') if artist_info else None,
+            image_cache.layout_key('LoadingPage', bg_image_path),
+            lambda artist_image: paste_artist_image(bg_image_pil, mask, artist_image, bbox)
+        )
+        if final_image_pil is not None:
+            root.after(0, lambda: show_artist_image(final_image_pil))
+
         def progress_callback(x, y):
             if y == 'unknown':
                 progress = f"{x}/?"
@@ -115,9 +112,9 @@ def show_loading_page(root, artist_name, search_word, on_back_callback, came_fro
         if artist_data:
             if search_word.strip():
                 # if a word is provided, search it
-                result = main.search_word_in_lyrics(search_word, artist_data, artist_name)
+                result = SecondPage.start_streamed_result(main.iter_search_word_in_lyrics(search_word, artist_data, artist_name))
                 loading_screen.destroy()
-                SecondPage.show_second_page(root, result, artist_data, search_word, on_back_callback)
+                SecondPage.show_second_page(root, result, artist_data, search_word, on_back_callback, artist_name)
             else:
                 # if no word, just load artist
                 loading_screen.destroy()
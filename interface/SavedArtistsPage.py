@@ -2,14 +2,13 @@ import tkinter as tk
 from PIL import Image, ImageTk
 import os
 import sys
-import json
-import numpy as np
-import requests
-import io
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import main
-from interface import LoadingPage
+from interface import LoadingPage, image_cache, page_masks
 
 # base directories and constants
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'assets')
@@ -21,6 +20,12 @@ FONT_MAIN = ('Comic Sans MS', 20, 'bold')
 FONT_SUB = ('Comic Sans MS', 16)
 FONT_TITLE = ('Comic Sans MS', 20, 'bold')
 MOUSEWHEEL_FACTOR = -1
+ARTIST_BLOCK_COORDS = (0, 230, 500, 350)  # area of the background each artist tile is cut from
+TILE_WORKERS = 4  # threads fetching and compositing artist images
+TILE_BATCH = 8  # finished tiles handed to Tk per tick
+TILE_POLL_MS = 30
+TILE_PHOTO_LIMIT = 40  # tile PhotoImages kept in memory
+OVERSCAN_ROWS = 2  # rows built above and below the visible ones
 
 def load_image(filename):
     path = os.path.join(ASSETS_DIR, filename)
@@ -35,7 +40,7 @@ def show_saved_artists_page(root, on_back_callback):
 
     # load main background image
     bg_image_path = os.path.join(ASSETS_DIR, 'SavedArtistsPage.png')
-    bg_image_pil = Image.open(bg_image_path).convert('RGB')
+    bg_image_pil = page_masks.load_background(bg_image_path)[0]
     bg_photo = ImageTk.PhotoImage(bg_image_pil)
 
     main_canvas = tk.Canvas(saved_artists_screen, width=750, height=750, highlightthickness=0)
@@ -43,43 +48,21 @@ def show_saved_artists_page(root, on_back_callback):
     main_canvas.create_image(0, 0, image=bg_photo, anchor='nw')
     main_canvas.bg_photo = bg_photo
 
-    artist_files = [f for f in os.listdir(DATA_DIR) if f.endswith('_lyrics.json')]
+    # names, images and song counts come from the catalog, not from the lyrics files
+    saved_artists = main.list_saved_artists()
 
-    if not artist_files:
+    if not saved_artists:
         # no saved artists found
         messagebox.showinfo("Information", "No saved artists found.")
         saved_artists_screen.destroy()
         on_back_callback()
         return
 
-    # scrollable area for artists
-    artists_area_frame = tk.Frame(saved_artists_screen, width=500, height=500)
-    artists_area_frame.place(x=0, y=210)
-    artists_canvas = tk.Canvas(artists_area_frame, width=500, height=500, bg="white", highlightthickness=0)
-    artists_canvas.pack(side='left', fill='both', expand=True)
-
-    inner_frame = tk.Frame(artists_canvas)
-    artists_canvas.create_window((0,0), window=inner_frame, anchor='nw')
-
-    # adjust scroll region when frame size changes
-    def on_frame_configure(event):
-        artists_canvas.configure(scrollregion=artists_canvas.bbox('all'))
-    inner_frame.bind('<Configure>', on_frame_configure)
-
-    # mouse wheel scrolling
-    def _on_mousewheel(event):
-        artists_canvas.yview_scroll(int(MOUSEWHEEL_FACTOR*(event.delta/120)), "units")
-    artists_canvas.bind_all("<MouseWheel>", _on_mousewheel)
-
     # extract block area for artist display
-    artist_block_coords = (0, 230, 500, 350)
-    artist_block_image = bg_image_pil.crop(artist_block_coords)
-    green_color = (0, 255, 17)
-    block_array = np.array(artist_block_image)
-    mask_array = np.all(block_array == green_color, axis=-1).astype(np.uint8)*255
-    mask = Image.fromarray(mask_array, mode='L')
-    bbox = mask.getbbox()
+    artist_block_coords = ARTIST_BLOCK_COORDS
+    artist_block_image, mask, bbox = page_masks.load_background(bg_image_path, artist_block_coords)
     block_width, block_height = artist_block_image.size
+    block_layout = image_cache.layout_key(f"SavedArtistsPage-{artist_block_coords}", bg_image_path)
 
     # load images
     loading_img = load_image('LoadingIcon1.png')
@@ -108,7 +91,7 @@ def show_saved_artists_page(root, on_back_callback):
             root.update()
 
         def do_update():
-            main.get_artist_data_with_progress(artist_name, progress_callback=progress_callback, force_update=True)
+            main.update_artist_data(artist_name, progress_callback=progress_callback)
             root.after(0, lambda: [
                 loading_label.destroy(),
                 progress_label.config(text=""),
@@ -136,7 +119,7 @@ def show_saved_artists_page(root, on_back_callback):
 
             icon_x = bbox[2] + 10
             icon_y = bbox[1] - 10
-            icon_item = artist_canvas_item.create_image(icon_x, icon_y, image=update_icon_img_resized, anchor='nw')
+            icon_item = artist_canvas_item.create_image(icon_x, icon_y, image=update_icon_img_resized, anchor='nw', tags='update_icon')
             artist_canvas_item.lift(icon_item)
 
             def on_update_click(e):
@@ -148,55 +131,149 @@ def show_saved_artists_page(root, on_back_callback):
         else:
             print("Update icon not found. Check if 'UpdateIcon.png' exists in the assets folder.")
 
-    for artist_file in artist_files:
-        data_file = os.path.join(DATA_DIR, artist_file)
-        with open(data_file, 'r', encoding='utf-8') as file:
-            artist_data = json.load(file)
-
-        artist_name = artist_data.get('artist', {}).get('name', 'Name not available')
-        artist_image_url = artist_data.get('artist', {}).get('image_url', None)
-        total_songs = len(artist_data.get('songs', []))
-
+    # artist image pasted into the block, cached on disk per image URL
+    def compose_block(artist_image):
         block_image = artist_block_image.copy()
+        artist_image_resized = artist_image.resize((bbox[2]-bbox[0], bbox[3]-bbox[1]), Image.LANCZOS)
+        mask_cropped = mask.crop(bbox)
+        block_image.paste(artist_image_resized, bbox[:2], mask_cropped)
+        return block_image
 
-        if artist_image_url:
-            # load artist image
+    # scrollable area for artists. the list is virtualized: only the rows in view plus
+    # OVERSCAN_ROWS on each side exist as widgets, and they are recycled while scrolling
+    artists_area_frame = tk.Frame(saved_artists_screen, width=500, height=500)
+    artists_area_frame.place(x=0, y=210)
+    artists_canvas = tk.Canvas(artists_area_frame, width=500, height=500, bg="white", highlightthickness=0)
+    artists_canvas.pack(side='left', fill='both', expand=True)
+
+    row_height = block_height
+    artists_canvas.configure(scrollregion=(0, 0, block_width, row_height * len(saved_artists)))
+    rows = []
+
+    # tiles show the empty block until their image is ready. images are fetched and
+    # composited on a thread pool, then turned into PhotoImages on the Tk thread in batches.
+    # at most TILE_PHOTO_LIMIT PhotoImages are kept, least recently shown first out
+    placeholder_photo = ImageTk.PhotoImage(artist_block_image)
+    tile_pool = ThreadPoolExecutor(max_workers=TILE_WORKERS)
+    finished_tiles = queue.Queue()
+    requested_tiles = {}  # artist index -> future
+    failed_tiles = set()
+    tile_photos = OrderedDict()  # artist index -> PhotoImage
+    polling = [False]
+
+    def load_tile(index, artist_image_url, artist_name):
+        try:
+            block_image = image_cache.get_composited(artist_image_url, block_layout, compose_block)
+        except Exception as e:
+            print(f"Error loading artist image {artist_name}: {e}")
+            block_image = None
+        finished_tiles.put((index, block_image))
+
+    def apply_finished_tiles():
+        if not saved_artists_screen.winfo_exists():
+            return
+        for _ in range(TILE_BATCH):
             try:
-                response = requests.get(artist_image_url)
-                response.raise_for_status()
-                image_data = response.content
-                artist_image = Image.open(io.BytesIO(image_data))
-                artist_image_resized = artist_image.resize((bbox[2]-bbox[0], bbox[3]-bbox[1]), Image.LANCZOS)
-                mask_cropped = mask.crop(bbox)
-                block_image.paste(artist_image_resized, bbox[:2], mask_cropped)
-            except Exception as e:
-                print(f"Error loading artist image {artist_name}: {e}")
-
-        block_photo = ImageTk.PhotoImage(block_image)
-        artist_frame = tk.Frame(inner_frame, width=block_width, height=block_height)
-        artist_frame.pack()
-        artist_frame.pack_propagate(0)
-
-        artist_canvas_item = tk.Canvas(artist_frame, width=block_width, height=block_height, highlightthickness=0)
-        artist_canvas_item.pack(fill='both', expand=True)
-
-        image_id = artist_canvas_item.create_image(0, 0, image=block_photo, anchor='nw')
-        artist_canvas_item.block_photo = block_photo
+                index, block_image = finished_tiles.get_nowait()
+            except queue.Empty:
+                break
+            requested_tiles.pop(index, None)
+            if block_image is None:
+                failed_tiles.add(index)
+                continue
+            tile_photos[index] = ImageTk.PhotoImage(block_image)
+            shown = {row['index'] for row in rows}
+            for old_index in list(tile_photos):
+                if len(tile_photos) <= TILE_PHOTO_LIMIT:
+                    break
+                if old_index not in shown:
+                    del tile_photos[old_index]
+            for row in rows:
+                if row['index'] == index:
+                    row['canvas'].itemconfigure(row['image_id'], image=tile_photos[index])
+        if requested_tiles or not finished_tiles.empty():
+            root.after(TILE_POLL_MS, apply_finished_tiles)
+        else:
+            polling[0] = False
+
+    # the tile image for an artist, the placeholder while it is still loading
+    def tile_photo(index):
+        photo = tile_photos.get(index)
+        if photo is not None:
+            tile_photos.move_to_end(index)
+            return photo
+        saved_artist = saved_artists[index]
+        if saved_artist.get('image_url') and index not in requested_tiles and index not in failed_tiles:
+            requested_tiles[index] = tile_pool.submit(load_tile, index, saved_artist['image_url'], saved_artist.get('name'))
+            if not polling[0]:
+                polling[0] = True
+                root.after(TILE_POLL_MS, apply_finished_tiles)
+        return placeholder_photo
+
+    def make_row():
+        row_canvas = tk.Canvas(artists_canvas, width=block_width, height=block_height, highlightthickness=0)
+        image_id = row_canvas.create_image(0, 0, image=placeholder_photo, anchor='nw')
+        name_x, name_y = bbox[2] + 20, bbox[1]
+        name_id = row_canvas.create_text(name_x, name_y, anchor='nw', text='', font=FONT_TITLE, fill=HIGHLIGHT_COLOR)
+        songs_id = row_canvas.create_text(name_x, name_y + 40, anchor='nw', text='', font=FONT_SUB, fill=HIGHLIGHT_COLOR)
+        window_id = artists_canvas.create_window(0, 0, window=row_canvas, anchor='nw')
+        row = {'canvas': row_canvas, 'image_id': image_id, 'name_id': name_id, 'songs_id': songs_id,
+               'window_id': window_id, 'index': None}
 
         # bind click on the artist image
-        artist_canvas_item.tag_bind(image_id, "<Button-1>", lambda e, an=artist_name, aci=artist_canvas_item: on_artist_click(e, an, aci))
+        row_canvas.tag_bind(image_id, "<Button-1>",
+                            lambda e: on_artist_click(e, saved_artists[row['index']].get('key'), row_canvas))
+        rows.append(row)
+        return row
+
+    def show_row(row, index):
+        saved_artist = saved_artists[index]
+        row_canvas = row['canvas']
+        row['index'] = index
+        row_canvas.delete('update_icon')
+        row_canvas.itemconfigure(row['image_id'], image=tile_photo(index))
+        row_canvas.itemconfigure(row['name_id'], text=saved_artist.get('name', 'Name not available'))
+        row_canvas.itemconfigure(row['songs_id'], text=f"total songs: {saved_artist.get('songs', 0)}")
+        artists_canvas.coords(row['window_id'], 0, index * row_height)
+        artists_canvas.itemconfigure(row['window_id'], state='normal')
+
+    # assigns rows to the artists in view, recycling the ones that scrolled out
+    def refresh_rows():
+        top = artists_canvas.canvasy(0)
+        view_height = artists_canvas.winfo_height()
+        if view_height <= 1:
+            view_height = 500
+        first = max(0, int(top // row_height) - OVERSCAN_ROWS)
+        last = min(len(saved_artists), int((top + view_height) // row_height) + 1 + OVERSCAN_ROWS)
+        wanted = range(first, last)
+
+        for index, future in list(requested_tiles.items()):
+            if index not in wanted and future.cancel():
+                del requested_tiles[index]
+
+        shown = {row['index'] for row in rows if row['index'] in wanted}
+        free_rows = [row for row in rows if row['index'] not in wanted]
+        for index in wanted:
+            if index not in shown:
+                show_row(free_rows.pop() if free_rows else make_row(), index)
+        for row in free_rows:
+            row['index'] = None
+            artists_canvas.itemconfigure(row['window_id'], state='hidden')
+
+    # called by Tk whenever the visible part of the list changes
+    artists_canvas.configure(yscrollcommand=lambda first, last: refresh_rows())
 
-        name_x, name_y = bbox[2] + 20, bbox[1]
-        artist_canvas_item.create_text(
-            name_x, name_y, anchor='nw', text=artist_name,
-            font=FONT_TITLE, fill=HIGHLIGHT_COLOR
-        )
-
-        songs_text = f"total songs: {total_songs}"
-        artist_canvas_item.create_text(
-            name_x, name_y + 40, anchor='nw', text=songs_text,
-            font=FONT_SUB, fill=HIGHLIGHT_COLOR
-        )
+    # mouse wheel scrolling
+    def _on_mousewheel(event):
+        artists_canvas.yview_scroll(int(MOUSEWHEEL_FACTOR*(event.delta/120)), "units")
+    artists_canvas.bind_all("<MouseWheel>", _on_mousewheel)
+
+    def on_screen_destroy(event):
+        if event.widget is saved_artists_screen:
+            tile_pool.shutdown(wait=False, cancel_futures=True)
+    saved_artists_screen.bind('<Destroy>', on_screen_destroy)
+
+    refresh_rows()
 
     back_button_area = main_canvas.create_rectangle(580, 650, 750, 750, fill="", outline="")
     main_canvas.tag_bind(back_button_area, "<Button-1>", lambda e: on_back(saved_artists_screen, on_back_callback))
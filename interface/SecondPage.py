@@ -2,13 +2,9 @@ import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 import os
-import requests
-import io
 import sys
-import numpy as np
-import lyricsgenius
-import json
-import config
+import threading
+import itertools
 
 # constants for styling
 BG_COLOR = '#ffd75d'  # background color for text box
@@ -17,42 +13,46 @@ FONT_TITLE = ('Comic Sans MS', 15, 'bold')
 FONT_LYRICS = ('Comic Sans MS', 13)
 FONT_SEARCHED_WORD = ('Comic Sans MS', 26, 'bold')
 
-# genius key
-genius = lyricsgenius.Genius(config.API_KEY)
+# result lines inserted per Text.insert call; the first chunk is drawn with the page,
+# the rest one chunk per event loop turn so large results never freeze the window
+RENDER_CHUNK_LINES = 500
+RENDER_DELAY_MS = 1
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# gets or fetches the artist image URL if missing
-def get_or_fetch_artist_image_url(artist_data):
+import main
+import lyrics_index
+from interface import image_cache, page_masks
+
+# gets or fetches the artist image URL if missing, through the shared artist resolution cache.
+# artist_name is the name the artist was searched by, the key its resolution is cached under.
+# may make a network call, so it runs off the Tk thread
+def get_or_fetch_artist_image_url(artist_data, artist_name=None):
     artist_image_url = artist_data.get('artist', {}).get('image_url', None)
     if not artist_image_url:
-        artist_name = artist_data.get('artist', {}).get('name', None)
+        artist_name = artist_name or artist_data.get('artist', {}).get('name', None)
         if artist_name:
-            artist = genius.search_artist(artist_name, max_songs=0, get_full_info=False)
-            if artist and artist.image_url:
-                artist_image_url = artist.image_url
+            try:
+                artist_info = main.resolve_artist(artist_name)
+            except Exception as e:
+                print(f"Error resolving artist {artist_name}: {e}")
+                artist_info = None
+            if artist_info and artist_info.get('image_url'):
+                artist_image_url = artist_info['image_url']
                 artist_data['artist']['image_url'] = artist_image_url
-                data_file = os.path.join('data', f"{artist_name}_lyrics.json")
-                with open(data_file, 'w', encoding='utf-8') as file:
-                    json.dump(artist_data, file, ensure_ascii=False)
     return artist_image_url
 
-# fetches the artist image and pastes it onto the background image
-def fetch_and_paste_artist_image(bg_image_pil, mask, bbox, artist_image_url):
-    green_composited = bg_image_pil.copy()
-    if artist_image_url:
-        try:
-            response = requests.get(artist_image_url)
-            response.raise_for_status()
-            image_data = response.content
-            artist_image = Image.open(io.BytesIO(image_data))
-            artist_image_resized = artist_image.resize((bbox[2] - bbox[0], bbox[3] - bbox[1]), Image.LANCZOS)
-            mask_cropped = mask.crop(bbox)
-            green_composited.paste(artist_image_resized, bbox[:2], mask_cropped)
-            return green_composited
-        except Exception:
-            return bg_image_pil
-    return bg_image_pil
+# fetches the artist image and pastes it onto the background image, both cached on disk
+def fetch_and_paste_artist_image(bg_image_pil, mask, bbox, artist_image_url, layout):
+    def compose(artist_image):
+        green_composited = bg_image_pil.copy()
+        artist_image_resized = artist_image.resize((bbox[2] - bbox[0], bbox[3] - bbox[1]), Image.LANCZOS)
+        mask_cropped = mask.crop(bbox)
+        green_composited.paste(artist_image_resized, bbox[:2], mask_cropped)
+        return green_composited
+    try:
+        return image_cache.get_composited(artist_image_url, layout, compose) or bg_image_pil
+    except Exception:
+        return bg_image_pil
 
 def configure_scrollbar(canvas, text_widget, x1, y1, width, height):
     style = ttk.Style()
@@ -69,41 +69,90 @@ def configure_scrollbar(canvas, text_widget, x1, y1, width, height):
     scrollbar.place(x=x1+width, y=y1, height=height)
     text_widget.configure(yscrollcommand=scrollbar.set)
 
-# bold highlight 
-def highlight_word_in_text(text_widget, search_word):
-    start_pos = "1.0"
-    while True:
-        start_pos = text_widget.search(search_word, start_pos, nocase=True, stopindex=tk.END)
-        if not start_pos:
-            break
-        end_pos = f"{start_pos}+{len(search_word)}c"
-        text_widget.tag_add('highlight', start_pos, end_pos)
-        start_pos = end_pos
-
-# displays the second page with search results
-def show_second_page(root, result, artist_data, search_word, on_back_callback):
+# appends text split at its highlight spans as (chars, tags) pairs for Text.insert
+def add_segments(args, text, spans, tag):
+    pos = 0
+    for start, end in spans:
+        if start > pos:
+            args.extend((text[pos:start], tag))
+        args.extend((text[start:end], (tag, 'highlight')))
+        pos = end
+    args.extend((text[pos:] + '\n', tag))
+
+# inserts titles and lyrics lines with their tags already applied, RENDER_CHUNK_LINES
+# lines per insert call, scheduling the next chunk until the whole result is shown
+def render_result(root, text_widget, result, search_word):
+    songs = lyrics_index.iter_match_spans(result, search_word)
+
+    def render_chunk():
+        if not text_widget.winfo_exists():
+            return
+        args = []
+        line_count = 0
+        for title, title_spans, lines in songs:
+            args.extend(('\n', 'title'))
+            add_segments(args, title, title_spans, 'title')
+            for line, spans in lines:
+                add_segments(args, line, spans, 'lyrics')
+            line_count += len(lines) + 1
+            if line_count >= RENDER_CHUNK_LINES:
+                break
+        if not args:
+            return
+        text_widget.configure(state='normal')
+        text_widget.insert(tk.END, *args)
+        text_widget.configure(state='disabled')
+        root.after(RENDER_DELAY_MS, render_chunk)
+
+    render_chunk()
+
+# runs a streamed search up to its first song in the calling worker thread, so index building
+# and the first match stay off the Tk thread; render_result pulls the rest chunk by chunk
+def start_streamed_result(results):
+    results = iter(results)
+    first = next(results, None)
+    return itertools.chain([first] if first is not None else [], results)
+
+# displays the second page with search results, a list or a stream of (title, lines)
+def show_second_page(root, result, artist_data, search_word, on_back_callback, artist_name=None):
 
     second_screen = tk.Frame(root, width=750, height=750)
     second_screen.place(x=0, y=0)
 
     # loads background and finds green mask bbox
     bg_image_path = os.path.join(os.path.dirname(__file__), 'assets', 'SecondPage.png')
-    bg_image_pil = Image.open(bg_image_path).convert('RGB')
-    green_color = (0, 255, 17)
-    bg_array = np.array(bg_image_pil)
-    mask_array = np.all(bg_array == green_color, axis=-1).astype(np.uint8) * 255
-    mask = Image.fromarray(mask_array, mode='L')
-    bbox = mask.getbbox()
+    bg_image_pil, mask, bbox = page_masks.load_background(bg_image_path)
 
-    artist_image_url = get_or_fetch_artist_image_url(artist_data)
-    composited_image = fetch_and_paste_artist_image(bg_image_pil, mask, bbox, artist_image_url)
+    layout = image_cache.layout_key('SecondPage', bg_image_path)
+    artist_image_url = artist_data.get('artist', {}).get('image_url', None)
+    if artist_image_url:
+        composited_image = fetch_and_paste_artist_image(bg_image_pil, mask, bbox, artist_image_url, layout)
+    else:
+        composited_image = bg_image_pil
 
     final_image = ImageTk.PhotoImage(composited_image)
     second_canvas = tk.Canvas(second_screen, width=750, height=750)
     second_canvas.pack(fill="both", expand=True)
-    second_canvas.create_image(0, 0, image=final_image, anchor='nw')
+    bg_item = second_canvas.create_image(0, 0, image=final_image, anchor='nw')
     second_canvas.final_image = final_image
 
+    # artists saved without an image URL are resolved in the background
+    def show_artist_image(composited_image):
+        if second_screen.winfo_exists():
+            final_image = ImageTk.PhotoImage(composited_image)
+            second_canvas.itemconfigure(bg_item, image=final_image)
+            second_canvas.final_image = final_image
+
+    def resolve_artist_image():
+        artist_image_url = get_or_fetch_artist_image_url(artist_data, artist_name)
+        if artist_image_url:
+            composited_image = fetch_and_paste_artist_image(bg_image_pil, mask, bbox, artist_image_url, layout)
+            if composited_image is not bg_image_pil:
+                root.after(0, lambda: show_artist_image(composited_image))
+
+    if not artist_image_url:
+        threading.Thread(target=resolve_artist_image, daemon=True).start()
+
     # places the searched word
     word_x, word_y = 200, 203
     second_canvas.create_text(word_x, word_y, anchor='nw', text=f"{search_word}", font=FONT_SEARCHED_WORD, fill=HIGHLIGHT_COLOR)
@@ -120,18 +169,8 @@ def show_second_page(root, result, artist_data, search_word, on_back_callback):
     result_text.tag_configure('title', font=FONT_TITLE, foreground=HIGHLIGHT_COLOR)
     result_text.tag_configure('lyrics', font=FONT_LYRICS)
     result_text.tag_configure('highlight', font=FONT_TITLE)
-    result_text.configure(state='normal')
-
-    # inserts titles and lyrics lines
-    for title, lines in result:
-        result_text.insert(tk.END, f"\n{title}\n", 'title')
-        if lines:
-            for line in lines:
-                result_text.insert(tk.END, f"{line}\n", 'lyrics')
-
-    highlight_word_in_text(result_text, search_word)
 
-    result_text.configure(state='disabled')
+    render_result(root, result_text, result, search_word)
 
     # places a back button
     back_x1, back_y1, back_x2, back_y2 = 280, 670, 475, 740
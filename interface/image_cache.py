@@ -0,0 +1,107 @@
+import os
+import io
+import hashlib
+import threading
+import requests
+from PIL import Image
+
+# on-disk cache of artist images keyed by URL, plus the already resized and
+# mask-composited variant each page layout draws, so revisiting a page needs
+# neither the network nor any resampling
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', '.cache', 'images')
+MAX_CACHE_BYTES = 128 * 1024 * 1024
+
+_lock = threading.Lock()
+
+def _key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_file, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_file, path)
+    evict()
+
+# marks a cached file as recently used
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+# drops the least recently used files once the cache is over MAX_CACHE_BYTES
+def evict(max_bytes=None):
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        files = []
+        for root, _, names in os.walk(CACHE_DIR):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+# identifies a page layout: a name plus the size/mtime of the background it is drawn on,
+# so editing the asset invalidates its composited images
+def layout_key(name, asset_path):
+    stat = os.stat(asset_path)
+    return f"{name}-{stat.st_size}-{stat.st_mtime_ns}"
+
+# the original image behind a URL, downloaded once. None if it can't be loaded
+def get_image(url):
+    if not url:
+        return None
+    path = os.path.join(CACHE_DIR, 'raw', _key(url))
+    try:
+        if os.path.exists(path):
+            _touch(path)
+            with open(path, 'rb') as file:
+                return Image.open(io.BytesIO(file.read()))
+        response = requests.get(url)
+        response.raise_for_status()
+        _write(path, response.content)
+        return Image.open(io.BytesIO(response.content))
+    except Exception as e:
+        print(f"Error loading artist image {url}: {e}")
+        return None
+
+# the image a page draws for an artist: compose(artist_image) is only called the first
+# time a URL is shown with a layout, after that the stored result is returned as is.
+# returns None if the artist image can't be loaded
+def get_composited(url, layout, compose):
+    if not url:
+        return None
+    path = os.path.join(CACHE_DIR, 'composited', f"{_key(url)}-{_key(layout)}.png")
+    if os.path.exists(path):
+        try:
+            _touch(path)
+            with open(path, 'rb') as file:
+                image = Image.open(io.BytesIO(file.read()))
+                image.load()
+                return image
+        except Exception as e:
+            print(f"Error reading cached image {path}: {e}")
+    artist_image = get_image(url)
+    if artist_image is None:
+        return None
+    composited = compose(artist_image)
+    buffer = io.BytesIO()
+    composited.save(buffer, format='PNG')
+    try:
+        _write(path, buffer.getvalue())
+    except OSError as e:
+        print(f"Warning: could not cache image {path}: {e}")
+    return composited
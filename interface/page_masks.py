@@ -0,0 +1,75 @@
+import os
+import json
+import threading
+import numpy as np
+from PIL import Image
+
+# the green (0, 255, 17) area of each page background marks where the artist image goes.
+# the mask and its bbox are computed once per asset, kept in memory and in a sidecar
+# next to the image cache, and recomputed only when the PNG changes
+GREEN_COLOR = (0, 255, 17)
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', '.cache', 'masks')
+
+_backgrounds = {}  # (asset path, crop) -> (stamp, background, mask, bbox)
+_lock = threading.Lock()
+
+def _stamp(asset_path):
+    stat = os.stat(asset_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+def _compute_mask(image):
+    mask_array = np.all(np.array(image) == GREEN_COLOR, axis=-1).astype(np.uint8) * 255
+    return Image.fromarray(mask_array, mode='L')
+
+def _sidecar(asset_path, crop, stamp):
+    name = os.path.splitext(os.path.basename(asset_path))[0]
+    crop_part = '-'.join(map(str, crop)) if crop else 'full'
+    return os.path.join(CACHE_DIR, f"{name}-{crop_part}-{stamp}")
+
+# (background, mask, bbox) for a page asset, optionally cropped to a region.
+# the background is shared, callers copy it before drawing on it
+def load_background(asset_path, crop=None):
+    key = (os.path.abspath(asset_path), tuple(crop) if crop else None)
+    stamp = _stamp(asset_path)
+    with _lock:
+        cached = _backgrounds.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1:]
+
+    background = Image.open(asset_path).convert('RGB')
+    if crop:
+        background = background.crop(crop)
+
+    sidecar = _sidecar(asset_path, crop, stamp)
+    mask = None
+    bbox = None
+    try:
+        with open(sidecar + '.json', 'r', encoding='utf-8') as file:
+            bbox = json.load(file)['bbox']
+        mask = Image.open(sidecar + '.png')
+        mask.load()
+        bbox = tuple(bbox) if bbox else None
+    except (OSError, ValueError, KeyError):
+        mask = None
+    if mask is None:
+        mask = _compute_mask(background)
+        bbox = mask.getbbox()
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            mask.save(sidecar + '.png')
+            with open(sidecar + '.json', 'w', encoding='utf-8') as file:
+                json.dump({'bbox': bbox}, file)
+        except OSError as e:
+            print(f"Warning: could not cache the mask of {asset_path}: {e}")
+
+    with _lock:
+        _backgrounds[key] = (stamp, background, mask, bbox)
+    return background, mask, bbox
+
+# loads every page background ahead of time, meant to run in a background thread at startup
+def preload(assets):
+    for asset_path, crop in assets:
+        try:
+            load_background(asset_path, crop)
+        except OSError as e:
+            print(f"Warning: could not preload {asset_path}: {e}")
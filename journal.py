@@ -0,0 +1,65 @@
+import os
+import json
+import threading
+
+# append-only JSONL checkpoint of an artist download, one record per line:
+#   {"artist": {...}}                                  resolved artist
+#   {"page": n, "songs": [...], "next_page": m}        one page of the song listing
+#   {"song": {...}}                                    lyrics fetched for one song
+# a later run replays it to resume where the previous one stopped
+class DownloadJournal:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    # replays the journal; an empty state if there is none. a torn last line, left by an
+    # interrupted write, is cut off the file so the next record starts on a line of its own
+    def load(self):
+        state = {'artist': None, 'listing': [], 'next_page': 1, 'listing_complete': False, 'songs': {}}
+        if not os.path.exists(self.path):
+            return state
+        with self.lock:
+            with open(self.path, 'r+b') as file:
+                data = file.read()
+                complete = data.rfind(b'\n') + 1
+                if complete < len(data):
+                    file.truncate(complete)
+        for line in data[:complete].split(b'\n'):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'artist' in record:
+                state['artist'] = record['artist']
+            elif 'page' in record:
+                state['listing'].extend(record['songs'])
+                state['next_page'] = record.get('next_page')
+                state['listing_complete'] = not record.get('next_page')
+            elif 'song' in record:
+                state['songs'][record['song']['id']] = record['song']
+        return state
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line)
+                file.flush()
+
+    def record_artist(self, artist_info):
+        self._append({'artist': artist_info})
+
+    # only what is needed to fetch the song later is kept
+    def record_page(self, page, songs, next_page):
+        listing = [{'id': song['id'], 'title': song.get('title'), 'url': song.get('url')} for song in songs]
+        self._append({'page': page, 'songs': listing, 'next_page': next_page})
+        return listing
+
+    def record_song(self, song_obj):
+        self._append({'song': song_obj})
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
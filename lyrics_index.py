@@ -0,0 +1,366 @@
+import os
+import re
+import sys
+import json
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import chain
+
+# bump when the on-disk index layout changes
+INDEX_VERSION = 2
+
+BRACKETS_RE = re.compile(r'\[.*?\]')
+TOKEN_RE = re.compile(r'\w+')
+
+# an index file starts with its version, source stamp and song count, so whether it is
+# current can be told from its first bytes without parsing the postings
+INDEX_HEADER_RE = re.compile(r'\{"version":(\d+),"source":\[(\d+),(\d+)\],"songs":(\d+),')
+INDEX_HEADER_CHARS = 128
+
+# searches of 3+ characters on one corpus before its trigram index is built, in the
+# background. building it costs several plain scans, so one-off searches never pay for it
+TRIGRAM_AFTER_QUERIES = 20
+
+# strips [Verse]/[Chorus] tags and lowercases a lyrics line
+def normalize_line(line):
+    return BRACKETS_RE.sub('', line).lower()
+
+# path of the index stored next to an artist's _lyrics.json cache
+def index_file_for(data_file):
+    if data_file.endswith('_lyrics.json'):
+        return data_file[:-len('_lyrics.json')] + '_index.json'
+    return os.path.splitext(data_file)[0] + '_index.json'
+
+# size and mtime of the cache file, used to detect a stale index
+def source_stamp(data_file):
+    stat = os.stat(data_file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+# builds token -> flat [song, line, song, line, ...] postings over the normalized lines
+def build_index(artist_data):
+    songs = artist_data.get('songs', [])
+    tokens = {}
+    for song_idx, song in enumerate(songs):
+        if not song.get('lyrics'):
+            continue
+        for line_idx, line in enumerate(song['lyrics'].split('\n')):
+            for token in set(TOKEN_RE.findall(normalize_line(line))):
+                postings = tokens.get(token)
+                if postings is None:
+                    postings = tokens[token] = []
+                postings.append(song_idx)
+                postings.append(line_idx)
+    return {'version': INDEX_VERSION, 'songs': len(songs), 'tokens': tokens}
+
+# writes the index next to the cache, stamped with the cache's current size/mtime
+def save_index(index, data_file):
+    index_file = index_file_for(data_file)
+    # header fields first, see INDEX_HEADER_RE
+    index = {'version': index['version'], 'source': source_stamp(data_file),
+             'songs': index['songs'], 'tokens': index['tokens']}
+    tmp_file = index_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as file:
+        json.dump(index, file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, index_file)
+    return index
+
+# whether the index file on disk matches the cache file, read from its header only
+def index_is_current(data_file, artist_data=None, stamp=None):
+    try:
+        stamp = stamp or source_stamp(data_file)
+        with open(index_file_for(data_file), 'r', encoding='utf-8') as file:
+            match = INDEX_HEADER_RE.match(file.read(INDEX_HEADER_CHARS))
+    except (OSError, ValueError):
+        return False
+    if match is None:
+        return False
+    version, size, mtime, songs = map(int, match.groups())
+    if version != INDEX_VERSION or [size, mtime] != stamp:
+        return False
+    return artist_data is None or songs == len(artist_data.get('songs', []))
+
+# loads the index for a cache file, None if it is missing, stale or unreadable.
+# kept on the ArtistData it was loaded for, so it goes away along with the artist
+def load_index(data_file, artist_data=None):
+    try:
+        stamp = source_stamp(data_file)
+    except OSError:
+        return None
+    cached = getattr(artist_data, 'token_index', None)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    if not index_is_current(data_file, artist_data, stamp):
+        return None
+    try:
+        with open(index_file_for(data_file), 'r', encoding='utf-8') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if isinstance(artist_data, ArtistData):
+        artist_data.token_index = (stamp, index, index_bytes(index))
+    return index
+
+# rough memory held by a loaded token index: the posting lists, their keys, and the ints
+# above 256 (smaller ones are shared by the interpreter)
+def index_bytes(index):
+    tokens = index['tokens']
+    postings = tokens.values()
+    return (sys.getsizeof(tokens) + sum(map(sys.getsizeof, tokens)) + sum(map(sys.getsizeof, postings))
+            + 28 * sum(map((256).__lt__, chain.from_iterable(postings))))
+
+# rough memory held by a list of song dicts and their fields
+def songs_bytes(songs):
+    return sys.getsizeof(songs) + sum(sys.getsizeof(song) + sum(map(sys.getsizeof, song.values())) for song in songs)
+
+# builds and saves the index if the one on disk is missing or stale, without loading it
+def ensure_index(artist_data, data_file):
+    if index_is_current(data_file, artist_data):
+        return
+    try:
+        save_index(build_index(artist_data), data_file)
+    except OSError as e:
+        print(f"Warning: could not write lyrics index for {data_file}: {e}")
+
+# ids of the corpus lines containing the word, looked up through the token index.
+# returns None when the word has no token characters to look up
+def search_index(word, corpus, index):
+    runs = TOKEN_RE.findall(word)
+    if not runs:
+        return None
+    key = max(runs, key=len)
+
+    # any line containing the word has a token containing its longest run
+    song_starts = corpus.song_starts
+    line_ids = set()
+    for token, postings in index['tokens'].items():
+        if key in token:
+            for i in range(0, len(postings), 2):
+                line_ids.add(song_starts[postings[i]] + postings[i + 1])
+    lines = corpus.lines
+    return sorted(line_id for line_id in line_ids if word in lines[line_id])
+
+# all lines joined by newlines, with the offset where each line starts
+def join_lines(lines):
+    line_starts = array('I', [0])
+    offset = 0
+    for line in lines:
+        offset += len(line) + 1
+        line_starts.append(offset)
+    return '\n'.join(lines), line_starts
+
+# flat, pre-normalized view of an artist's lyrics: every line of every song once as shown
+# and once stripped/lowercased, with song offsets, so a query is a scan with no regex
+class LyricsCorpus:
+    def __init__(self, artist_data):
+        songs = artist_data.get('songs', [])
+        self.source = songs
+        self.titles = [song.get('title') for song in songs]
+        self.display_lines = []
+        self.lines = []
+        self.song_starts = array('I')
+        self.line_song = array('I')
+        for song_idx, song in enumerate(songs):
+            self.song_starts.append(len(self.lines))
+            if not song.get('lyrics'):
+                continue
+            display_lines = song['lyrics'].split('\n')
+            # the bracket regex never crosses a newline, so the whole song can be normalized at once
+            normalized = normalize_line(song['lyrics']).split('\n')
+            self.display_lines.extend(display_lines)
+            self.lines.extend(normalized)
+            self.line_song.extend([song_idx] * len(normalized))
+        self.song_starts.append(len(self.lines))
+
+        self.blob, self.line_starts = join_lines(self.lines)
+        self._trigram_index = None
+        self._trigram_lock = threading.Lock()
+        self.queries = 0
+        self._bytes = (sum(map(sys.getsizeof, self.display_lines)) + sum(map(sys.getsizeof, self.lines))
+                       + sum(map(sys.getsizeof, (self.display_lines, self.lines, self.blob, self.titles,
+                                                 self.song_starts, self.line_song, self.line_starts))))
+
+    def is_current(self, artist_data):
+        songs = artist_data.get('songs', [])
+        return songs is self.source and len(songs) == len(self.titles)
+
+    # rough memory held by the corpus and its trigram index if built, measured once each
+    def memory_bytes(self):
+        trigram_index = self._trigram_index
+        return self._bytes + (trigram_index.memory_bytes if trigram_index is not None else 0)
+
+    # the normalized lines joined by newlines and the offset each one starts at
+    def joined_lines(self):
+        return self.blob, self.line_starts
+
+    def trigram_index(self):
+        with self._trigram_lock:
+            if self._trigram_index is None:
+                self._trigram_index = TrigramIndex(self)
+        return self._trigram_index
+
+    # counts a search that had to scan, starting the trigram build once they add up
+    def _count_query(self):
+        self.queries += 1
+        if self.queries == TRIGRAM_AFTER_QUERIES:
+            threading.Thread(target=self.trigram_index, daemon=True).start()
+
+    # ids of the lines containing the word, one find() per matching line over the joined lines
+    def scan(self, word):
+        return list(self.iter_scan(word))
+
+    # same as scan, found one at a time so a consumer can stop early
+    def iter_scan(self, word):
+        if not word:
+            yield from range(len(self.lines))
+            return
+        if '\n' in word:
+            return
+        blob = self.blob
+        line_starts = self.line_starts
+        last_line = len(self.lines) - 1
+        pos = blob.find(word)
+        while pos != -1:
+            line_id = bisect_right(line_starts, pos) - 1
+            yield line_id
+            if line_id >= last_line:
+                break
+            pos = blob.find(word, line_starts[line_id + 1])
+
+    # (title, matching lines) per song, in song and line order
+    def group(self, line_ids):
+        return list(self.iter_group(line_ids))
+
+    # same as group, each song given as soon as its last matching line is seen
+    def iter_group(self, line_ids):
+        current_song = None
+        matching_lines = []
+        for line_id in line_ids:
+            song_idx = self.line_song[line_id]
+            if song_idx != current_song:
+                if current_song is not None:
+                    yield self.titles[current_song], matching_lines
+                current_song = song_idx
+                matching_lines = []
+            matching_lines.append(self.display_lines[line_id])
+        if current_song is not None:
+            yield self.titles[current_song], matching_lines
+
+    # matching line ids, lazily: trigrams for words of 3+ chars once the index is built
+    # (trigrams=True builds it now, False never uses it), then the saved token index if
+    # given, then the plain scan
+    def iter_line_ids(self, word, index=None, trigrams=None):
+        if len(word) >= 3 and trigrams is not False:
+            trigram_index = self.trigram_index() if trigrams else self._trigram_index
+            if trigram_index is not None:
+                lines = self.lines
+                return (line_id for line_id in trigram_index.candidates(word) if word in lines[line_id])
+            self._count_query()
+        line_ids = search_index(word, self, index) if index is not None else None
+        if line_ids is None:
+            return self.iter_scan(word)
+        return iter(line_ids)
+
+    # same results as the old per-song regex scan
+    def search(self, word, index=None, trigrams=None):
+        return list(self.iter_search(word, index, trigrams))
+
+    # same as search, streamed one (title, matching lines) at a time
+    def iter_search(self, word, index=None, trigrams=None):
+        return self.iter_group(self.iter_line_ids(word, index, trigrams))
+
+# trigram -> sorted line ids over the corpus' normalized lines, so substring
+# queries ("love" in "glove") only verify lines holding every trigram of the word
+class TrigramIndex:
+    def __init__(self, corpus):
+        postings = {}
+        for line_id, line in enumerate(corpus.lines):
+            for gram in {line[i:i + 3] for i in range(len(line) - 2)}:
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array('I')
+                ids.append(line_id)
+        self.postings = postings
+        self.memory_bytes = (sys.getsizeof(postings) + sum(map(sys.getsizeof, postings))
+                             + sum(map(sys.getsizeof, postings.values())))
+
+    # ids of the lines that can contain the word, None if it is too short to narrow down
+    def candidates(self, word):
+        if len(word) < 3:
+            return None
+        grams = {word[i:i + 3] for i in range(len(word) - 2)}
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not lists[0]:
+            return []
+        candidate_ids = set(lists[0])
+        for ids in lists[1:]:
+            # few enough left, the exact check is cheaper than more intersections
+            if len(candidate_ids) <= 64:
+                break
+            candidate_ids.intersection_update(ids)
+        return sorted(candidate_ids)
+
+# artist data as loaded from the cache; a plain dict for json.dump and every existing
+# caller, with the normalized corpus attached lazily on first search
+class ArtistData(dict):
+    _corpus = None
+    token_index = None  # (source stamp, index, its memory) once load_index has read it
+    _songs_bytes = (None, 0)  # (song count, memory) of the last songs measured
+
+    # rough memory held by this artist: its songs, plus the corpus and indexes that were
+    # built for it so far. what artist_cache charges, re-measured as the structures appear
+    def memory_bytes(self):
+        songs = self.get('songs', [])
+        if isinstance(songs, list):
+            if self._songs_bytes[0] != len(songs):
+                self._songs_bytes = (len(songs), songs_bytes(songs))
+            total = self._songs_bytes[1]
+        else:
+            total = 0
+        corpus = self._corpus if isinstance(songs, list) else getattr(songs, 'corpus', None)
+        if corpus is not None:
+            total += corpus.memory_bytes()
+        if self.token_index is not None:
+            total += self.token_index[2]
+        return total
+
+    # releases the file of a memory-mapped cache, which can't be searched afterwards
+    def close(self):
+        close = getattr(self.get('songs'), 'close', None)
+        if close is not None:
+            close()
+
+    @property
+    def corpus(self):
+        # songs of a memory-mapped cache carry their own corpus
+        songs_corpus = getattr(self.get('songs'), 'corpus', None)
+        if songs_corpus is not None:
+            return songs_corpus
+        if self._corpus is None or not self._corpus.is_current(self):
+            self._corpus = LyricsCorpus(self)
+        return self._corpus
+
+# the corpus for any artist data dict, cached when it came from get_artist_data_with_progress
+def get_corpus(artist_data):
+    if isinstance(artist_data, ArtistData):
+        return artist_data.corpus
+    return LyricsCorpus(artist_data)
+
+def _word_pattern(word):
+    return re.compile(re.escape(word), re.IGNORECASE) if word else None
+
+# (start, end) of every case-insensitive occurrence of the word in a display string,
+# non-overlapping and left to right like Tk's nocase text search
+def match_spans(text, word, pattern=None):
+    pattern = pattern or _word_pattern(word)
+    if pattern is None:
+        return []
+    return [match.span() for match in pattern.finditer(text)]
+
+# search results with their highlight offsets, one song at a time so a caller can draw
+# the first songs before the rest are computed: (title, title spans, [(line, line spans), ...])
+def iter_match_spans(result, word):
+    pattern = _word_pattern(word)
+    for title, lines in result:
+        yield (title, match_spans(title, word, pattern),
+               [(line, match_spans(line, word, pattern)) for line in lines or []])
@@ -1,114 +1,826 @@
 import sys
 import os
+import argparse
+import contextlib
+import atexit
 import lyricsgenius
 import json
-import re
+import asyncio
+import itertools
 import threading
 import time
 import config
+import lyrics_index
+import downloader
+import genius_async
+import journal
+import search_all
+import artist_cache
+import binary_store
+import batch_search
+import catalog
+import artist_resolver
+import metrics
 
 # Initialize Genius API
 genius = lyricsgenius.Genius(config.API_KEY, timeout=120)
 
+# lyricsgenius raises HTTPError(status, message) without the response, so the responses of
+# its session are recorded to honor a 429's Retry-After header (see downloader.ResponseRecorder)
+genius_responses = downloader.ResponseRecorder(genius._session) if hasattr(genius, '_session') else None
+
+# Download throughput, overridable in config.py; all workers share one rate limiter
+FETCH_WORKERS = getattr(config, 'FETCH_WORKERS', 8)
+REQUESTS_PER_SECOND = getattr(config, 'REQUESTS_PER_SECOND', 5)
+
+# The rate starts at REQUESTS_PER_SECOND, creeps up to MAX_REQUESTS_PER_SECOND while the API
+# answers and halves on every 429. Transient failures are retried MAX_RETRIES times with
+# jittered exponential backoff, then failed songs get SONG_RETRY_ROUNDS more passes at the end
+MAX_REQUESTS_PER_SECOND = getattr(config, 'MAX_REQUESTS_PER_SECOND', REQUESTS_PER_SECOND * 2)
+MAX_RETRIES = getattr(config, 'MAX_RETRIES', 5)
+RETRY_BASE_DELAY = getattr(config, 'RETRY_BASE_DELAY', 1.0)
+RETRY_MAX_DELAY = getattr(config, 'RETRY_MAX_DELAY', 60.0)
+SONG_RETRY_ROUNDS = getattr(config, 'SONG_RETRY_ROUNDS', 2)
+retry_policy = downloader.RetryPolicy(MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+# Lean downloads take each song's title and url from the artist's song listing and go straight
+# to its lyrics page, one request per song instead of two. The rest of the song metadata
+# (release date, album, featured artists) is then only fetched on demand, see enrich_song_metadata
+LEAN_FETCH = getattr(config, 'LEAN_FETCH', True)
+
+# Rate limiter shared by the workers of one download
+def make_limiter(requests_per_second=None):
+    rate = requests_per_second or REQUESTS_PER_SECOND
+    return downloader.RateLimiter(rate, max_rate=max(rate, MAX_REQUESTS_PER_SECOND))
+
+# Loaded artists kept in memory between searches, up to this many MB
+ARTIST_CACHE_MB = getattr(config, 'ARTIST_CACHE_MB', 512)
+loaded_artists = artist_cache.ArtistCache(ARTIST_CACHE_MB * 1024 * 1024)
+
+# 'binary' also keeps a memory-mapped copy (<artist>_lyrics.lfb) next to each JSON cache
+# and loads from it, the JSON file stays the source of truth
+CACHE_FORMAT = getattr(config, 'CACHE_FORMAT', 'json')
+
 # Directory to store cached data
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
 if not os.path.exists(data_dir):
     os.makedirs(data_dir)
 
+# Artist name -> Genius id, canonical name and image, shared by every path that needs it
+ARTIST_RESOLVE_TTL_DAYS = getattr(config, 'ARTIST_RESOLVE_TTL_DAYS', 7)
+resolved_artists = artist_resolver.ArtistResolver(os.path.join(data_dir, '.cache', 'artists.json'),
+                                                  ARTIST_RESOLVE_TTL_DAYS * 24 * 3600)
+
+# Per-stage timings and counters (see metrics.py), recorded only when enabled in config.py
+# or with --metrics; dumped to METRICS_FILE on exit when set
+METRICS_FILE = getattr(config, 'METRICS_FILE', None)
+if getattr(config, 'METRICS_ENABLED', False):
+    metrics.enable()
+    if METRICS_FILE:
+        atexit.register(metrics.dump, METRICS_FILE)
+
+# Calls a Genius client method, counted and timed under api.<method>.
+# Transient failures are retried through retry_policy, paced by the limiter if given
+def genius_call(method, *args, limiter=None, **kwargs):
+    def call():
+        metrics.count('api.requests')
+        metrics.count(f"api.requests.{method}")
+        with metrics.timed(f"api.{method}"):
+            if genius_responses:
+                genius_responses.clear()
+            try:
+                return getattr(genius, method)(*args, **kwargs)
+            except Exception as e:
+                metrics.count('api.errors')
+                if genius_responses:
+                    genius_responses.attach(e)
+                raise
+    return retry_policy.call(call, limiter)
+
+# Looks an artist up on Genius, {'id', 'name', 'image_url'} or None
+def search_artist_info(artist_name, limiter=None):
+    artist = genius_call('search_artist', artist_name, max_songs=0, get_full_info=False, limiter=limiter)
+    if not artist:
+        return None
+    return {'id': artist.id, 'name': artist.name, 'image_url': artist.image_url}
+
+# Resolves an artist through the resolution cache, at most one Genius lookup per TTL.
+# Makes a network call on a miss, so keep it off the Tk thread
+def resolve_artist(artist_name, limiter=None):
+    return resolved_artists.resolve(artist_name, lambda name: search_artist_info(name, limiter))
+
 # Searches for a word in the artist's lyrics
 def search_word_in_lyrics(word, artist_data, artist_name):
+    with metrics.timed('search.word'):
+        return list(iter_search_word_in_lyrics(word, artist_data, artist_name))
+
+# Same results as search_word_in_lyrics, yielded one (title, matching_lines) song at a time
+# and stopping after max_songs songs if given, so the first matches can be shown right away
+def iter_search_word_in_lyrics(word, artist_data, artist_name, max_songs=None):
     word = word.lower()
     found = False
-    result = []
     if 'songs' in artist_data:
-        for song in artist_data['songs']:
-            if not song.get('lyrics'):
-                continue
-            lyrics_lines = song['lyrics'].split('\n')
-            matching_lines = [line for line in lyrics_lines if word in re.sub(r'\[.*?\]', '', line).lower()]
-            if matching_lines:
-                result.append((song['title'], matching_lines))
-                found = True
+        # scan over the pre-normalized corpus; the saved token index, loaded on first need,
+        # only helps words too short for a fast scan
+        data_file = os.path.join(data_dir, f"{artist_name}_lyrics.json")
+        corpus = lyrics_index.get_corpus(artist_data)
+        index = lyrics_index.load_index(data_file, artist_data) if len(word) < 3 else None
+        results = corpus.iter_search(word, index)
+        for song in itertools.islice(results, max_songs):
+            found = True
+            yield song
     if not found:
-        result.append((f"Word '{word}' not found in any song of artist '{artist_name}'.", []))
+        yield (f"Word '{word}' not found in any song of artist '{artist_name}'.", [])
+
+# Searches for many words at once in a single pass over the artist's lyrics.
+# Returns {word: result}, each result what search_word_in_lyrics gives for the word,
+# and {word: {'songs', 'lines', 'matches'}} counts, 'matches' counting every occurrence
+def search_words_in_lyrics(words, artist_data, artist_name):
+    terms = {word: word.lower() for word in words}
+    term_results, term_counts = {}, {}
+    if 'songs' in artist_data:
+        corpus = lyrics_index.get_corpus(artist_data)
+        with metrics.timed('search.batch'):
+            term_results, term_counts = batch_search.search_terms(corpus, terms.values())
+    results = {}
+    counts = {}
+    for word, term in terms.items():
+        results[word] = term_results.get(term) or [(f"Word '{term}' not found in any song of artist '{artist_name}'.", [])]
+        counts[word] = term_counts.get(term, {'songs': 0, 'lines': 0, 'matches': 0})
+    return results, counts
+
+# Artist name that stands for every saved artist
+ALL_ARTISTS = '*'
+
+# Searches for a word in every saved artist in parallel, results as ("artist - title", lines).
+# result_callback(artist_name, result) is called as each artist finishes
+def search_word_in_all_artists(word, result_callback=None):
+    artist_results = []
+    with metrics.timed('search.all_artists'):
+        for key, name, result in search_all.iter_search_all_artists(word, data_dir):
+            artist_results.append((key, name, result))
+            if result_callback and result:
+                result_callback(name or key, result)
+    result = [(f"{artist} - {title}", lines) for (artist, title), lines in search_all.merge_results(artist_results)]
+    if not result:
+        result.append((f"Word '{word.lower()}' not found in any saved artist.", []))
     return result
 
-# Gets artist data, downloads songs if not already saved
-def get_artist_data_with_progress(artist_name, progress_callback=None, force_update=False):
+# Loads the cached artist data, None if it is missing or corrupted.
+# Served from memory while the file is unchanged; use_memory=False gives a private copy to modify
+def load_cached_artist_data(artist_name, use_memory=True):
     data_file = os.path.join(data_dir, f"{artist_name}_lyrics.json")
-    
-    # Load cached data if available and not forcing an update
-    if not force_update and os.path.exists(data_file):
-        try:
+    if use_memory:
+        artist_data = loaded_artists.get(artist_name, data_file)
+        if artist_data is not None:
+            return artist_data
+    if not os.path.exists(data_file):
+        return None
+    try:
+        start = time.perf_counter()
+        artist_data = binary_store.load_binary(data_file) if use_memory and CACHE_FORMAT == 'binary' else None
+        if artist_data is None:
             with open(data_file, 'r', encoding='utf-8') as file:
-                artist_data = json.load(file)
-                return artist_data
-        except json.JSONDecodeError:
-            print(f"Warning: Cached data for {artist_name} is corrupted. Fetching fresh data.")
+                artist_data = lyrics_index.ArtistData(json.load(file))
+            # migrate JSON caches saved before the binary copy existed
+            if use_memory and CACHE_FORMAT == 'binary':
+                binary_store.write_binary(artist_data, data_file)
+        # build the search index once for caches saved before it existed
+        lyrics_index.ensure_index(artist_data, data_file)
+        metrics.observe('cache.load', time.perf_counter() - start)
+        if use_memory:
+            loaded_artists.put(artist_name, data_file, artist_data)
+        return artist_data
+    except json.JSONDecodeError:
+        print(f"Warning: Cached data for {artist_name} is corrupted. Fetching fresh data.")
+        return None
+
+# Saves artist data to the cache along with its search index.
+# Written to a temporary file first so an interrupted save never leaves a truncated cache
+def save_artist_data(artist_name, artist_data):
+    data_file = os.path.join(data_dir, f"{artist_name}_lyrics.json")
+    tmp_file = data_file + '.tmp'
+    with metrics.timed('cache.save.json'):
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            # songs of a memory-mapped cache are a read-only sequence, not a list
+            json.dump(dict(artist_data, songs=list(artist_data.get('songs', []))), file, ensure_ascii=False)
+        os.replace(tmp_file, data_file)
+    with metrics.timed('cache.save.index'):
+        lyrics_index.save_index(lyrics_index.build_index(artist_data), data_file)
+    written = [data_file, lyrics_index.index_file_for(data_file)]
+    if CACHE_FORMAT == 'binary':
+        # a binary copy that failed to write is just stale, loads fall back to the JSON
+        try:
+            with metrics.timed('cache.save.binary'):
+                written.append(binary_store.write_binary(artist_data, data_file))
+        except OSError as e:
+            print(f"Warning: could not write the binary cache for {artist_name}: {e}")
+    if metrics.enabled():
+        metrics.count('bytes.written', sum(os.path.getsize(path) for path in written))
+    loaded_artists.put(artist_name, data_file, artist_data)
+    catalog.update_entry(data_dir, artist_name, artist_data, data_file)
+
+# Saved artists from the catalog: name, image_url, songs (count), updated, size, index_version
+def list_saved_artists():
+    return catalog.list_artists(data_dir)
+
+# Builds the binary copy of every saved artist, for switching CACHE_FORMAT to 'binary'
+def migrate_cache_to_binary():
+    return binary_store.migrate_data_dir(data_dir)
+
+# Checkpoint journal of an artist download in progress
+def get_download_journal(artist_name):
+    return journal.DownloadJournal(os.path.join(data_dir, f"{artist_name}_lyrics.partial.jsonl"))
+
+# Song details kept from a Genius song response: release date, album and featured artists
+def song_metadata(song):
+    album = song.get('album') or {}
+    return {
+        'release_date': song.get('release_date'),
+        'album': album.get('name'),
+        'featured_artists': [artist.get('name') for artist in song.get('featured_artists') or []]
+    }
+
+# Whether a song is fetched lean, straight from its listing entry, or through a song request.
+# Shared by the threaded and asyncio ingests along with song_object
+def fetches_lean(song_info, lean=None):
+    return (LEAN_FETCH if lean is None else lean) and bool(song_info.get('url'))
+
+# The saved form of a downloaded song: title and url from the song response when there was
+# one, along with its metadata, else from the listing entry
+def song_object(song_info, lyrics, song=None):
+    if song is None:
+        return {'id': song_info['id'], 'title': song_info.get('title'), 'url': song_info['url'], 'lyrics': lyrics}
+    return {
+        'id': song['id'],
+        'title': song['title'],
+        'url': song['url'],
+        'lyrics': lyrics,
+        'metadata': song_metadata(song)
+    }
+
+# Fetches lyrics for a single song, None if it failed; the error it failed with, if any,
+# goes into the errors dict when given, keyed by song ID (see transient_failures).
+# Lean fetches use the title and url of the listing entry and skip the song request
+def fetch_song_lyrics(song_info, limiter, lean=None, errors=None):
+    if errors is not None:
+        errors.pop(song_info['id'], None)
+    try:
+        if fetches_lean(song_info, lean):
+            return song_object(song_info, genius_call('lyrics', song_url=song_info['url'], limiter=limiter))
+        song = genius_call('song', song_info['id'], limiter=limiter)
+        if song and 'song' in song:
+            song_lyrics = genius_call('lyrics', song_url=song['song']['url'], limiter=limiter)
+            return song_object(song_info, song_lyrics, song['song'])
+    except Exception as e:
+        print(f"Error fetching lyrics for song {song_info['title']}: {e}")
+        if errors is not None:
+            errors[song_info['id']] = e
+    metrics.count('songs.failed')
+    return None
+
+# The failed songs worth another try, those whose last error the retry policy deems transient.
+# Songs that failed for good (not found, no song in the response) are dropped and counted
+# under songs.dropped, so neither the retry rounds nor later updates ask for them again
+def transient_failures(failed, errors, policy=None):
+    policy = policy or retry_policy
+    transient = [song_info for song_info in failed
+                 if song_info['id'] in errors and policy.is_transient(errors[song_info['id']])]
+    dropped = len(failed) - len(transient)
+    if dropped:
+        print(f"Skipping {dropped} songs that cannot be downloaded.")
+        metrics.count('songs.dropped', dropped)
+    return transient
+
+# Paces the SONG_RETRY_ROUNDS extra passes over songs that still failed after their request
+# retries, shared by the threaded and asyncio ingests: yields the pause before each pass
+# for as long as failed() has songs left
+def song_retry_rounds(failed):
+    for retry_round in range(SONG_RETRY_ROUNDS):
+        songs = failed()
+        if not songs:
+            return
+        print(f"Retrying {len(songs)} songs that failed to download.")
+        metrics.count('songs.requeued', len(songs))
+        yield retry_policy.delay(retry_round + 1)
+
+# Gives the songs that still failed transiently after their request retries their extra passes,
+# once the rest of the download is done. fetch must record errors like fetch_song_lyrics.
+# Returns the recovered (song_info, song_obj) pairs and the song_infos still missing
+def retry_failed_songs(failed, fetch, errors, workers=None):
+    failed = transient_failures(failed, errors)
+    recovered = []
+    for pause in song_retry_rounds(lambda: failed):
+        time.sleep(pause)
+        still_failed = []
+        for song_info, song_obj in zip(failed, downloader.fetch_all(failed, fetch, workers=workers or FETCH_WORKERS)):
+            if song_obj:
+                recovered.append((song_info, song_obj))
+            else:
+                still_failed.append(song_info)
+        failed = transient_failures(still_failed, errors)
+    return recovered, failed
+
+# Records the songs that could not be downloaded in the artist data, so they are saved with it.
+# The missing ones, that failed transiently, are tried again by update_artist_data instead of
+# being silently dropped; the rest of the failed ones go to skipped_songs, which updates treat
+# as known until their listing entry changes. Skipped songs downloaded since are forgotten
+def set_missing_songs(artist_data, failed, missing):
+    def entry(song_info):
+        return {'id': song_info['id'], 'title': song_info.get('title'), 'url': song_info.get('url')}
+
+    if missing:
+        print(f"{len(missing)} songs could not be downloaded, updating the artist will retry them.")
+        artist_data['missing_songs'] = [entry(song_info) for song_info in missing]
+    else:
+        artist_data.pop('missing_songs', None)
+    missing_ids = {song_info['id'] for song_info in missing}
+    skipped = {song_info['id']: song_info for song_info in artist_data.get('skipped_songs', [])}
+    skipped.update((song_info['id'], entry(song_info)) for song_info in failed if song_info['id'] not in missing_ids)
+    for song in artist_data.get('songs', []):
+        skipped.pop(song.get('id'), None)
+    for song_id in missing_ids:
+        skipped.pop(song_id, None)
+    if skipped:
+        artist_data['skipped_songs'] = list(skipped.values())
+    else:
+        artist_data.pop('skipped_songs', None)
+
+# Reports what a download cost: printed, counted under ingest.api_calls and, when the caller
+# passed a stats dict, written into it as api_calls, songs and lean
+def report_api_calls(artist_name, limiter, song_count, lean, stats=None):
+    print(f"Downloaded {song_count} songs of {artist_name} with {limiter.requests} API calls.")
+    metrics.count('ingest.api_calls', limiter.requests)
+    if stats is not None:
+        stats.update(api_calls=limiter.requests, songs=song_count, lean=lean)
+
+# Yields (page, songs, next_page) for the artist's song listing; request errors are raised
+def iter_artist_song_pages(artist_id, limiter, sort='title', per_page=50, start_page=1):
+    page = start_page
+    while page:
+        # paced by the limiter instead of a fixed delay, retried on transient errors
+        response = genius_call('artist_songs', artist_id, page=page, per_page=per_page, sort=sort, limiter=limiter)
+        if not response or 'songs' not in response:
+            return
+        yield page, response['songs'], response.get('next_page')
+        page = response.get('next_page')
+
+# Gets artist data, downloads songs if not already saved.
+# Downloads are checkpointed to a journal and resumed from it if a previous run was interrupted.
+# lean overrides LEAN_FETCH; stats, if a dict, receives the API calls the download made
+def get_artist_data_with_progress(artist_name, progress_callback=None, force_update=False, workers=None, requests_per_second=None,
+                                  lean=None, stats=None):
+    # Load cached data if available and not forcing an update
+    if not force_update:
+        artist_data = load_cached_artist_data(artist_name)
+        if artist_data is not None:
+            return artist_data
     
     # Fetch fresh data from Genius API
     try:
-        artist = genius.search_artist(artist_name, max_songs=1, get_full_info=False)
-        if not artist:
-            print(f"Artist '{artist_name}' not found.")
-            return None
+        ingest_start = time.perf_counter()
+        lean = LEAN_FETCH if lean is None else lean
+        limiter = make_limiter(requests_per_second)
+        download_journal = get_download_journal(artist_name)
+        state = download_journal.load()
+        artist_info = state['artist']
+        if artist_info is None:
+            with metrics.timed('ingest.resolve_artist'):
+                artist_info = resolve_artist(artist_name, limiter)
+            if not artist_info:
+                print(f"Artist '{artist_name}' not found.")
+                return None
+            download_journal.record_artist(artist_info)
+        else:
+            print(f"Resuming download for {artist_name} from its checkpoint.")
         
-        artist_id = artist.id
-        songs = []
-        page = 1
-        per_page = 50
-        total_songs = None
+        songs = state['listing']
+        listing_complete = state['listing_complete']
         
-        # Fetch all songs for the artist
-        while True:
+        # Fetch all songs for the artist, continuing from the last journaled page
+        if not listing_complete:
+            listing_start = time.perf_counter()
             try:
-                response = genius.artist_songs(artist_id, page=page, per_page=per_page)
-                if response and 'songs' in response:
-                    songs.extend(response['songs'])
+                for page, page_songs, next_page in iter_artist_song_pages(artist_info['id'], limiter,
+                                                                          start_page=state['next_page']):
+                    songs.extend(download_journal.record_page(page, page_songs, next_page))
                     if progress_callback:
                         progress_callback(len(songs), 'unknown')
-                    if response.get('next_page'):
-                        page += 1
-                        time.sleep(1)  # Add delay to avoid rate-limiting
-                    else:
-                        break
-                else:
-                    break
+                listing_complete = True
             except Exception as e:
-                print(f"Error fetching songs: {e}")
-                break
+                print(f"Error fetching songs: {e}. The download will resume from its checkpoint next time.")
+            metrics.observe('ingest.listing', time.perf_counter() - listing_start)
         
-        # Fetch lyrics for each song
-        song_objs = []
-        total_songs = len(songs)
-        for idx, song_info in enumerate(songs):
-            try:
-                song = genius.song(song_info['id'])
-                if song and 'song' in song:
-                    song_lyrics = genius.lyrics(song_url=song['song']['url'])
-                    song_obj = {
-                        'title': song['song']['title'],
-                        'lyrics': song_lyrics
-                    }
-                    song_objs.append(song_obj)
-                if progress_callback:
-                    progress_callback(idx + 1, total_songs)
-            except Exception as e:
-                print(f"Error fetching lyrics for song {song_info['title']}: {e}")
+        # Fetch lyrics for the songs not fetched yet, journaling each one as it arrives
+        fetched = state['songs']
+        pending = [song_info for song_info in songs if song_info['id'] not in fetched]
+        errors = {}
+        
+        def fetch_song(song_info):
+            with metrics.timed('ingest.song'):
+                song_obj = fetch_song_lyrics(song_info, limiter, lean, errors)
+            if song_obj:
+                download_journal.record_song(song_obj)
+                metrics.count('songs.fetched')
+            return song_obj
+        
+        def pending_progress(current, total):
+            progress_callback(current + len(songs) - len(pending), len(songs))
+        
+        with metrics.timed('ingest.fetch_songs'):
+            for song_info, song_obj in zip(pending, downloader.fetch_all(
+                    pending, fetch_song, workers=workers or FETCH_WORKERS,
+                    progress_callback=pending_progress if progress_callback else None)):
+                if song_obj:
+                    fetched[song_info['id']] = song_obj
+            recovered, missing = retry_failed_songs([song_info for song_info in pending if song_info['id'] not in fetched],
+                                                    fetch_song, errors, workers)
+            for song_info, song_obj in recovered:
+                fetched[song_info['id']] = song_obj
+        song_objs = [fetched[song_info['id']] for song_info in songs if song_info['id'] in fetched]
         
-        # Save artist data to cache
-        artist_data = {
-            'artist': {
-                'name': artist.name,
-                'image_url': artist.image_url
-            },
+        artist_data = lyrics_index.ArtistData({
+            'artist': artist_info,
             'songs': song_objs
-        }
-        with open(data_file, 'w', encoding='utf-8') as file:
-            json.dump(artist_data, file, ensure_ascii=False)
+        })
+        set_missing_songs(artist_data, [song_info for song_info in pending if song_info['id'] not in fetched], missing)
+        report_api_calls(artist_name, limiter, len(song_objs), lean, stats)
+        
+        # Save artist data to cache once the listing is complete, the journal is no longer needed
+        if listing_complete:
+            with metrics.timed('ingest.save'):
+                save_artist_data(artist_name, artist_data)
+            download_journal.discard()
+        metrics.observe('ingest.total', time.perf_counter() - ingest_start)
         
         return artist_data
     
     except Exception as e:
         print(f"Error fetching artist data: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# Refreshes a cached artist, downloading lyrics only for new or changed songs.
+# The listing is paged newest first and stops at the first page made only of known songs;
+# caches saved before song IDs were recorded are matched by title once, without re-downloading
+def update_artist_data(artist_name, progress_callback=None, workers=None, requests_per_second=None, lean=None, stats=None):
+    artist_data = load_cached_artist_data(artist_name, use_memory=False)
+    if artist_data is None:
+        return get_artist_data_with_progress(artist_name, progress_callback, force_update=True, workers=workers,
+                                             requests_per_second=requests_per_second, lean=lean, stats=stats)
+    try:
+        lean = LEAN_FETCH if lean is None else lean
+        limiter = make_limiter(requests_per_second)
+        artist_info = artist_data.setdefault('artist', {})
+        artist_id = artist_info.get('id')
+        if not artist_id:
+            resolved = resolve_artist(artist_name, limiter)
+            if not resolved:
+                print(f"Artist '{artist_name}' not found.")
+                return artist_data
+            artist_id = artist_info['id'] = resolved['id']
+            artist_info['image_url'] = resolved.get('image_url') or artist_info.get('image_url')
+
+        songs = artist_data.setdefault('songs', [])
+        by_id = {song['id']: song for song in songs if song.get('id')}
+        # songs that could not be downloaded for good, known until their listing entry changes
+        skipped = {song_info['id']: song_info for song_info in artist_data.get('skipped_songs', [])}
+        # songs of an older version still without an ID, by title; duplicate titles are
+        # matched one listing entry each
+        by_title = {}
+        for song in songs:
+            if not song.get('id') and not song.get('unlisted'):
+                by_title.setdefault(song.get('title'), []).append(song)
+
+        # Page the listing until it only shows songs we already have
+        to_fetch = []
+        listed = 0
+        for page, page_songs, next_page in iter_artist_song_pages(artist_id, limiter, sort='release_date'):
+            listed += len(page_songs)
+            if progress_callback:
+                progress_callback(listed, 'unknown')
+            page_known = True
+            for song_info in page_songs:
+                cached_song = by_id.get(song_info['id']) or skipped.get(song_info['id'])
+                if cached_song is None and song_info.get('title') in by_title:
+                    # backfill the ID of a song saved by an older version
+                    title_songs = by_title[song_info['title']]
+                    cached_song = title_songs.pop()
+                    if not title_songs:
+                        del by_title[song_info['title']]
+                    cached_song['id'] = song_info['id']
+                    cached_song['url'] = song_info.get('url')
+                    by_id[song_info['id']] = cached_song
+                    continue
+                if cached_song is None:
+                    page_known = False
+                    to_fetch.append(song_info)
+                elif cached_song.get('title') != song_info.get('title') or cached_song.get('url') != song_info.get('url'):
+                    page_known = False
+                    to_fetch.append(song_info)
+            if page_known and not by_title:
+                break
+        else:
+            # the whole listing was seen: songs still unmatched were renamed or removed on
+            # Genius, marked so later refreshes can stop early instead of looking for them again
+            for title_songs in by_title.values():
+                for song in title_songs:
+                    song['unlisted'] = True
+
+        # Songs that failed last time are tried again along with the new ones
+        queued = {song_info['id'] for song_info in to_fetch}
+        to_fetch.extend(song_info for song_info in artist_data.get('missing_songs', []) if song_info['id'] not in queued)
+
+        # Fetch lyrics for the new or changed songs and merge them into the cache
+        errors = {}
+
+        def fetch_song(song_info):
+            return fetch_song_lyrics(song_info, limiter, lean, errors)
+
+        with metrics.timed('update.fetch_songs'):
+            fetched = downloader.fetch_all(to_fetch, fetch_song, workers=workers or FETCH_WORKERS,
+                                           progress_callback=progress_callback)
+            recovered, missing = retry_failed_songs([song_info for song_info, song_obj in zip(to_fetch, fetched) if not song_obj],
+                                                    fetch_song, errors, workers)
+        updated = fetched + [song_obj for _, song_obj in recovered]
+        report_api_calls(artist_name, limiter, sum(1 for song_obj in updated if song_obj), lean, stats)
+        for song_obj in updated:
+            if not song_obj:
+                continue
+            metrics.count('songs.fetched')
+            cached_song = by_id.get(song_obj['id'])
+            if cached_song is not None:
+                cached_song.update(song_obj)
+            else:
+                songs.append(song_obj)
+                by_id[song_obj['id']] = song_obj
+        set_missing_songs(artist_data, [song_info for song_info in to_fetch if song_info['id'] not in by_id], missing)
+
+        with metrics.timed('update.save'):
+            save_artist_data(artist_name, artist_data)
+        return artist_data
+
+    except Exception as e:
+        print(f"Error updating artist data: {e}")
+        return artist_data
+
+# Fetches the metadata lean downloads skip for saved songs that don't have it yet, only those
+# in song_ids if given, so it can be filled in lazily when it is actually needed.
+# Returns the updated artist data, None if the artist isn't saved
+def enrich_song_metadata(artist_name, song_ids=None, workers=None, requests_per_second=None):
+    artist_data = load_cached_artist_data(artist_name, use_memory=False)
+    if artist_data is None:
+        return None
+    wanted = set(song_ids) if song_ids is not None else None
+    to_enrich = [song for song in artist_data.get('songs', [])
+                 if song.get('id') and 'metadata' not in song and (wanted is None or song['id'] in wanted)]
+    if not to_enrich:
+        return artist_data
+    limiter = make_limiter(requests_per_second)
+
+    def fetch_metadata(song):
+        try:
+            response = genius_call('song', song['id'], limiter=limiter)
+            if response and 'song' in response:
+                return song_metadata(response['song'])
+        except Exception as e:
+            print(f"Error fetching metadata for song {song.get('title')}: {e}")
+        return None
+
+    with metrics.timed('enrich.fetch_songs'):
+        for song, metadata in zip(to_enrich, downloader.fetch_all(to_enrich, fetch_metadata, workers=workers or FETCH_WORKERS)):
+            if metadata is not None:
+                song['metadata'] = metadata
+    save_artist_data(artist_name, artist_data)
+    return artist_data
+
+# asyncio variant of get_artist_data_with_progress: pages, song metadata and lyrics pages
+# are fetched as overlapping coroutines over one pooled keep-alive session (needs aiohttp).
+# api_root points the API calls at another server, e.g. a local stub
+async def get_artist_data_async(artist_name, progress_callback=None, force_update=False, workers=None, requests_per_second=None, api_root=None,
+                                lean=None, stats=None):
+    if not force_update:
+        artist_data = load_cached_artist_data(artist_name)
+        if artist_data is not None:
+            return artist_data
+
+    try:
+        lean = LEAN_FETCH if lean is None else lean
+        rate = requests_per_second or REQUESTS_PER_SECOND
+        async with genius_async.GeniusSession(config.API_KEY, api_root=api_root, workers=workers or FETCH_WORKERS,
+                                              requests_per_second=rate, max_requests_per_second=max(rate, MAX_REQUESTS_PER_SECOND),
+                                              retry_policy=retry_policy) as session:
+            download_journal = get_download_journal(artist_name)
+            state = download_journal.load()
+            artist_info = state['artist']
+            if artist_info is None:
+                artist_info = resolved_artists.get(artist_name)
+            if artist_info is None:
+                artist = await session.search_artist(artist_name)
+                if not artist:
+                    print(f"Artist '{artist_name}' not found.")
+                    return None
+                artist_info = {'id': artist['id'], 'name': artist['name'], 'image_url': artist.get('image_url')}
+                resolved_artists.put(artist_name, artist_info)
+            if not state['artist']:
+                download_journal.record_artist(artist_info)
+
+            songs = []
+            tasks = []
+            fetched = state['songs']
+            done = [0]
+            total_songs = [None]
+            errors = {}
+
+            # Fetch lyrics for a single song while the listing is still being paged
+            async def fetch_song(song_info):
+                errors.pop(song_info['id'], None)
+                try:
+                    song_obj = None
+                    if fetches_lean(song_info, lean):
+                        song_obj = song_object(song_info, await session.lyrics(song_info['url']))
+                    else:
+                        song = await session.song(song_info['id'])
+                        if song and 'song' in song:
+                            song_obj = song_object(song_info, await session.lyrics(song['song']['url']), song['song'])
+                    if song_obj:
+                        download_journal.record_song(song_obj)
+                        fetched[song_info['id']] = song_obj
+                        metrics.count('songs.fetched')
+                except Exception as e:
+                    print(f"Error fetching lyrics for song {song_info['title']}: {e}")
+                    metrics.count('songs.failed')
+                    errors[song_info['id']] = e
+                finally:
+                    done[0] += 1
+                    if progress_callback and total_songs[0] is not None:
+                        progress_callback(done[0], total_songs[0])
+
+            def schedule(listing):
+                for song_info in listing:
+                    songs.append(song_info)
+                    if song_info['id'] in fetched:
+                        done[0] += 1
+                    else:
+                        tasks.append(asyncio.ensure_future(fetch_song(song_info)))
+
+            # Fetch all songs for the artist, starting each song as soon as its page arrives
+            schedule(state['listing'])
+            listing_complete = state['listing_complete']
+            page = state['next_page']
+            while not listing_complete:
+                try:
+                    response = await session.artist_songs(artist_info['id'], page=page, per_page=50)
+                except Exception as e:
+                    print(f"Error fetching songs: {e}. The download will resume from its checkpoint next time.")
+                    break
+                if not response or 'songs' not in response:
+                    listing_complete = True
+                    break
+                next_page = response.get('next_page')
+                schedule(download_journal.record_page(page, response['songs'], next_page))
+                if progress_callback:
+                    progress_callback(len(songs), 'unknown')
+                page = next_page
+                listing_complete = not next_page
+
+            total_songs[0] = len(songs)
+            if progress_callback:
+                progress_callback(done[0], total_songs[0])
+            await asyncio.gather(*tasks)
+
+            # Songs that still failed transiently get SONG_RETRY_ROUNDS more passes, like the threaded ingest
+            failed = transient_failures([song_info for song_info in songs if song_info['id'] not in fetched],
+                                        errors, session.retry_policy)
+            for pause in song_retry_rounds(lambda: failed):
+                await asyncio.sleep(pause)
+                done[0] -= len(failed)
+                await asyncio.gather(*(fetch_song(song_info) for song_info in failed))
+                failed = transient_failures([song_info for song_info in failed if song_info['id'] not in fetched],
+                                            errors, session.retry_policy)
+
+            report_api_calls(artist_name, session.limiter, len(fetched), lean, stats)
+
+        artist_data = lyrics_index.ArtistData({
+            'artist': artist_info,
+            'songs': [fetched[song_info['id']] for song_info in songs if song_info['id'] in fetched]
+        })
+        set_missing_songs(artist_data, [song_info for song_info in songs if song_info['id'] not in fetched], failed)
+        if listing_complete:
+            save_artist_data(artist_name, artist_data)
+            download_journal.discard()
+        return artist_data
+
+    except Exception as e:
+        print(f"Error fetching artist data: {e}")
+        return None
+
+# Runs the asyncio ingest to completion from a plain thread or a headless script
+def run_artist_data_async(artist_name, progress_callback=None, **kwargs):
+    return asyncio.run(get_artist_data_async(artist_name, progress_callback, **kwargs))
+
+# Headless query runner: loads (or downloads) each artist once, runs every query and
+# writes one JSON object per query. Kept free of tkinter/PIL so it starts fast
+def read_queries(path):
+    queries = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError(f"{path}:{line_number}: a query must be a JSON object")
+            words = query.get('words')
+            if words is None:
+                words = [query.get('word')]
+            if not query.get('artist') or not isinstance(query['artist'], str) or not isinstance(words, list) \
+                    or not words or not all(isinstance(word, str) for word in words):
+                raise ValueError(f"{path}:{line_number}: a query needs 'artist' and 'word' or 'words'")
+            queries.extend((query['artist'], word) for word in words)
+    return queries
+
+# JSON-ready form of a search result: song and line counts and the matches.
+# a song only appears with at least one matching line, the "not found" entry has none
+def result_record(result):
+    matches = [(title, lines) for title, lines in result if lines]
+    return {
+        'songs': len(matches),
+        'lines': sum(len(lines) for _, lines in matches),
+        'results': [{'title': title, 'lines': lines} for title, lines in matches],
+    }
+
+def run_queries(queries, output, max_songs=None, download=True):
+    loaded = {}
+    for artist_name, word in queries:
+        record = {'artist': artist_name, 'word': word}
+        load_ms = 0.0
+        # library diagnostics go to stderr, stdout only carries the JSON lines
+        with contextlib.redirect_stdout(sys.stderr):
+            if artist_name != ALL_ARTISTS and artist_name not in loaded:
+                start = time.perf_counter()
+                if download:
+                    loaded[artist_name] = get_artist_data_with_progress(artist_name)
+                else:
+                    loaded[artist_name] = load_cached_artist_data(artist_name)
+                load_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            if artist_name == ALL_ARTISTS:
+                result = search_word_in_all_artists(word)[:max_songs]
+            elif loaded[artist_name]:
+                result = list(iter_search_word_in_lyrics(word, loaded[artist_name], artist_name, max_songs))
+                metrics.observe('search.word', time.perf_counter() - start)
+            else:
+                result = None
+            search_ms = (time.perf_counter() - start) * 1000
+
+        if result is None:
+            record['error'] = f"Artist '{artist_name}' not found."
+        else:
+            record.update(result_record(result))
+        record['load_ms'] = round(load_ms, 3)
+        record['search_ms'] = round(search_ms, 3)
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+
+# --max-songs: a whole number of 0 or more
+def non_negative_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected a whole number of 0 or more, got '{value}'")
+    return number
+
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Search saved or downloaded lyrics without the GUI, one JSON line per query.")
+    parser.add_argument('-a', '--artist', action='append', default=[], help=f"artist to search, repeatable; '{ALL_ARTISTS}' searches every saved artist")
+    parser.add_argument('-w', '--word', action='append', default=[], help="word to search for, repeatable")
+    parser.add_argument('-q', '--queries', help="JSONL file of {\"artist\": ..., \"word\": ...} or {\"artist\": ..., \"words\": [...]} queries")
+    parser.add_argument('-o', '--output', help="write the JSON lines here instead of stdout")
+    parser.add_argument('--max-songs', type=non_negative_int, help="stop each search after this many songs")
+    parser.add_argument('--no-download', action='store_true', help="only search artists already saved")
+    parser.add_argument('--metrics', metavar='FILE', help="record stage timings and counters and write them here")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    queries = [(artist_name, word) for artist_name in args.artist for word in args.word]
+    if args.queries:
+        try:
+            queries.extend(read_queries(args.queries))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    if not queries:
+        parser.error("give at least one --artist and --word, or a --queries file")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            run_queries(queries, output, args.max_songs, not args.no_download)
+    else:
+        run_queries(queries, sys.stdout, args.max_songs, not args.no_download)
+    if args.metrics:
+        metrics.dump(args.metrics)
+
+if __name__ == '__main__':
+    run_cli()
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+
+# process-wide counters and stage timings for the ingest and search paths.
+# off by default: count(), observe() and timed() return right away until enable() is
+# called, timed() handing back one shared no-op context manager.
+#
+#   metrics.enable()                      start recording
+#   metrics.add_hook(callback)            callback(kind, name, value) per event,
+#                                         kind being 'count' or 'time' (seconds)
+#   metrics.snapshot()                    counters and timing stats so far
+#   metrics.dump(path)                    snapshot written as JSON
+#
+# names are dotted, 'ingest.lyrics', 'api.requests.song', 'search.word'...
+SAMPLES_PER_TIMING = 1000  # recent durations kept per name for the percentiles
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}
+_timings = {}  # name -> [count, total, max, recent samples]
+_hooks = []
+_started = time.time()
+_null = nullcontext()
+
+def enabled():
+    return _enabled
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def reset():
+    global _started
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+        _started = time.time()
+
+def add_hook(callback):
+    _hooks.append(callback)
+
+def remove_hook(callback):
+    if callback in _hooks:
+        _hooks.remove(callback)
+
+def count(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+    for hook in _hooks:
+        hook('count', name, value)
+
+def observe(name, seconds):
+    if not _enabled:
+        return
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = [0, 0.0, 0.0, deque(maxlen=SAMPLES_PER_TIMING)]
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2] = max(timing[2], seconds)
+        timing[3].append(seconds)
+    for hook in _hooks:
+        hook('time', name, seconds)
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+# with metrics.timed('ingest.save'): ... records how long the block took
+def timed(name):
+    if not _enabled:
+        return _null
+    return _Timer(name)
+
+def _stats(timing):
+    count, total, longest, samples = timing
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    return {
+        'count': count,
+        'total_s': round(total, 6),
+        'mean_ms': round(total / count * 1000, 3),
+        'p50_ms': round(rank(50) * 1000, 3),
+        'p90_ms': round(rank(90) * 1000, 3),
+        'p99_ms': round(rank(99) * 1000, 3),
+        'max_ms': round(longest * 1000, 3),
+    }
+
+def snapshot():
+    with _lock:
+        return {
+            'enabled': _enabled,
+            'since': _started,
+            'counters': dict(sorted(_counters.items())),
+            'timings': {name: _stats(timing) for name, timing in sorted(_timings.items())},
+        }
+
+def dump(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as file:
+        json.dump(snapshot(), file, indent=1)
+    os.replace(tmp_file, path)
@@ -0,0 +1,60 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import lyrics_index
+import binary_store
+
+# worker pool shared by every cross-artist search, started on first use
+_pool = None
+
+# artist key of a cache file, the same name get_artist_data_with_progress was called with
+def artist_key(data_file):
+    return os.path.basename(data_file)[:-len('_lyrics.json')]
+
+def list_artist_files(data_dir):
+    return sorted(os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.endswith('_lyrics.json'))
+
+# runs in a worker process: loads one cache and searches it.
+# a one-off search does a plain scan, building the trigram index would cost more than it saves
+def search_artist_file(data_file, word):
+    try:
+        # the memory-mapped copy is much cheaper to open when there is a current one
+        artist_data = binary_store.load_binary(data_file)
+        if artist_data is None:
+            with open(data_file, 'r', encoding='utf-8') as file:
+                artist_data = lyrics_index.ArtistData(json.load(file))
+    except (OSError, ValueError) as e:
+        print(f"Error loading {data_file}: {e}")
+        return artist_key(data_file), None, []
+    if 'songs' not in artist_data:
+        return artist_key(data_file), None, []
+    # the token index only helps words too short for a fast scan
+    index = lyrics_index.load_index(data_file, artist_data) if len(word) < 3 else None
+    result = artist_data.corpus.search(word, index, trigrams=False)
+    artist_data.close()
+    return artist_key(data_file), artist_data.get('artist', {}).get('name'), result
+
+def get_pool(workers=None):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+# yields (artist key, display name, [(title, lines), ...]) per saved artist as each search completes
+def iter_search_all_artists(word, data_dir, workers=None):
+    word = word.lower()
+    pool = get_pool(workers)
+    futures = [pool.submit(search_artist_file, data_file, word) for data_file in list_artist_files(data_dir)]
+    for future in as_completed(futures):
+        yield future.result()
+
+# merges per-artist results into ((artist, title), lines) ordered by artist, songs in cache order.
+# lines of songs saved twice under the same title are combined
+def merge_results(artist_results):
+    by_artist = {}
+    for key, name, result in artist_results:
+        songs = by_artist.setdefault(name or key, {})
+        for title, lines in result:
+            songs.setdefault(title, []).extend(lines)
+    return [((artist, title), lines) for artist in sorted(by_artist, key=str.lower)
+            for title, lines in by_artist[artist].items()]
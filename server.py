@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import config
+import main
+import lyrics_index
+import metrics
+
+# local HTTP/JSON query service over the saved lyrics. loaded artists stay in main's
+# memory cache with their corpus and indexes built, so a query is only the search.
+#
+#   GET  /artists                              saved artists from the catalog
+#   GET  /search?artist=A&word=W[&word=W2][&max_songs=N]
+#   POST /search   {"artist": A, "word": W} or {"artist": A, "words": [...]}, "max_songs": N
+#   POST /ingest   {"artist": A, "force_update": false}   downloads in the background
+#   GET  /ingest?artist=A                      state of that download
+#   GET  /metrics                              counters and stage timings, see metrics.py
+#
+# only listens on localhost unless told otherwise, there is no authentication
+SERVER_HOST = getattr(config, 'SERVER_HOST', '127.0.0.1')
+SERVER_PORT = getattr(config, 'SERVER_PORT', 8765)
+SERVER_WORKERS = getattr(config, 'SERVER_WORKERS', 8)
+INGEST_WORKERS = getattr(config, 'INGEST_WORKERS', 1)
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# HTTPServer handing each connection to a fixed pool of worker threads
+class PooledHTTPServer(HTTPServer):
+    def __init__(self, address, handler, workers):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+# loaded artists with their search structures built, one load at a time per artist
+class WarmArtists:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.artist_locks = {}
+
+    def get(self, artist_name):
+        with self.lock:
+            artist_lock = self.artist_locks.setdefault(artist_name, threading.Lock())
+        with artist_lock:
+            artist_data = main.load_cached_artist_data(artist_name)
+            if artist_data is not None and 'songs' in artist_data:
+                corpus = lyrics_index.get_corpus(artist_data)
+                if hasattr(corpus, 'trigram_index'):
+                    corpus.trigram_index()
+            return artist_data
+
+    def preload(self):
+        for entry in main.list_saved_artists():
+            self.get(entry['key'])
+
+# background downloads through get_artist_data_with_progress, one job per artist
+class IngestJobs:
+    def __init__(self, warm_artists, workers=INGEST_WORKERS):
+        self.warm_artists = warm_artists
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.jobs = {}  # artist name -> job state
+
+    def start(self, artist_name, force_update=False):
+        with self.lock:
+            job = self.jobs.get(artist_name)
+            if job and job['status'] in ('queued', 'running'):
+                return dict(job), False
+            job = self.jobs[artist_name] = {'artist': artist_name, 'status': 'queued', 'progress': None,
+                                            'songs': None, 'api_calls': None, 'error': None, 'queued_at': time.time()}
+            queued = dict(job)
+        self.pool.submit(self._run, artist_name, force_update)
+        return queued, True
+
+    def status(self, artist_name):
+        with self.lock:
+            job = self.jobs.get(artist_name)
+            return dict(job) if job else None
+
+    def _update(self, artist_name, **fields):
+        with self.lock:
+            self.jobs[artist_name].update(fields)
+
+    def _run(self, artist_name, force_update):
+        self._update(artist_name, status='running')
+
+        def progress_callback(current, total):
+            self._update(artist_name, progress=[current, total])
+
+        stats = {}
+        try:
+            artist_data = main.get_artist_data_with_progress(artist_name, progress_callback, force_update=force_update, stats=stats)
+        except Exception as e:
+            self._update(artist_name, status='failed', error=str(e), finished_at=time.time())
+            return
+        if not artist_data:
+            self._update(artist_name, status='failed', error=f"Artist '{artist_name}' not found.", finished_at=time.time())
+            return
+        # searchable straight away, with its structures built
+        self.warm_artists.get(artist_name)
+        self._update(artist_name, status='done', songs=len(artist_data.get('songs', [])), api_calls=stats.get('api_calls'),
+                     finished_at=time.time())
+
+# the artist name, which ends up in file names under main.data_dir: a non-empty string
+# that stays in that directory
+def _artist(params):
+    artist_name = params.get('artist')
+    if not isinstance(artist_name, str) or not artist_name.strip():
+        raise RequestError(400, "give 'artist' as a string")
+    data_file = os.path.realpath(os.path.join(main.data_dir, f"{artist_name}_lyrics.json"))
+    if '\0' in artist_name or os.path.dirname(data_file) != os.path.realpath(main.data_dir):
+        raise RequestError(400, "'artist' must be a name, not a path")
+    return artist_name
+
+def _words(params):
+    words = params.get('words')
+    if words is None:
+        words = [params['word']] if params.get('word') is not None else []
+    if not isinstance(words, list) or not words or not all(isinstance(word, str) for word in words):
+        raise RequestError(400, "give 'word' as a string or 'words' as a list of strings")
+    return words
+
+# None when not given, else a whole number of 0 or more (a string in a query string)
+def _max_songs(params):
+    max_songs = params.get('max_songs')
+    if max_songs is None:
+        return None
+    if isinstance(max_songs, str) and max_songs.isdigit():
+        return int(max_songs)
+    if isinstance(max_songs, int) and not isinstance(max_songs, bool) and max_songs >= 0:
+        return max_songs
+    raise RequestError(400, "'max_songs' must be a whole number of 0 or more")
+
+def search(warm_artists, params):
+    artist_name = _artist(params)
+    words = _words(params)
+    max_songs = _max_songs(params)
+
+    load_ms = 0.0
+    start = time.perf_counter()
+    if artist_name == main.ALL_ARTISTS:
+        records = {word: main.result_record(main.search_word_in_all_artists(word)[:max_songs]) for word in words}
+    else:
+        artist_data = warm_artists.get(artist_name)
+        if artist_data is None:
+            raise RequestError(404, f"Artist '{artist_name}' is not saved, POST /ingest to download it.")
+        load_ms = round((time.perf_counter() - start) * 1000, 3)
+        start = time.perf_counter()
+        if len(words) == 1:
+            result = list(main.iter_search_word_in_lyrics(words[0], artist_data, artist_name, max_songs))
+            metrics.observe('search.word', time.perf_counter() - start)
+            records = {words[0]: main.result_record(result)}
+        else:
+            # one pass over the corpus for every word
+            results, _ = main.search_words_in_lyrics(words, artist_data, artist_name)
+            records = {word: main.result_record(result[:max_songs]) for word, result in results.items()}
+    search_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    if len(words) == 1 and 'words' not in params:
+        return dict(artist=artist_name, word=words[0], load_ms=load_ms, search_ms=search_ms, **records[words[0]])
+    return {'artist': artist_name, 'words': records, 'load_ms': load_ms, 'search_ms': search_ms}
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = 'LyricFinder/1'
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise RequestError(400, "the request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise RequestError(400, "the request body must be a JSON object")
+        return body
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/artists' and method == 'GET':
+                return self._send(200, {'artists': main.list_saved_artists()})
+            if url.path == '/metrics' and method == 'GET':
+                return self._send(200, metrics.snapshot())
+            if url.path == '/search' and method == 'GET':
+                words = parse_qs(url.query).get('word', [])
+                if len(words) > 1:
+                    query['words'] = words
+                return self._send(200, search(self.server.warm_artists, query))
+            if url.path == '/search' and method == 'POST':
+                return self._send(200, search(self.server.warm_artists, self._read_json()))
+            if url.path == '/ingest' and method == 'POST':
+                body = self._read_json()
+                job, started = self.server.ingest_jobs.start(_artist(body), bool(body.get('force_update')))
+                return self._send(202 if started else 200, job)
+            if url.path == '/ingest' and method == 'GET':
+                job = self.server.ingest_jobs.status(query.get('artist', ''))
+                if job is None:
+                    raise RequestError(404, "no download for this artist")
+                return self._send(200, job)
+            raise RequestError(404, f"no endpoint {method} {url.path}")
+        except RequestError as e:
+            self._send(e.status, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+def make_server(host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS):
+    server = PooledHTTPServer((host, port), QueryHandler, workers)
+    server.warm_artists = WarmArtists()
+    server.ingest_jobs = IngestJobs(server.warm_artists)
+    return server
+
+def run_server(argv=None):
+    parser = argparse.ArgumentParser(description="Serve searches over the saved lyrics as HTTP/JSON.")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help="requests handled at once")
+    parser.add_argument('--preload', action='store_true', help="load every saved artist before serving")
+    parser.add_argument('--metrics', action='store_true', help="record stage timings and counters for GET /metrics")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    server = make_server(args.host, args.port, args.workers)
+    if args.preload:
+        server.warm_artists.preload()
+    print(f"Serving lyrics searches on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    run_server()
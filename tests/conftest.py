@@ -0,0 +1,27 @@
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.py holds the Genius API key and is created by each user, the tests never call Genius
+try:
+    import config  # noqa: F401
+except ImportError:
+    sys.modules['config'] = types.SimpleNamespace(API_KEY='test')
+
+
+import pytest
+
+
+# main with its data directory, loaded artists and resolved artists all under tmp_path
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    import main
+    import artist_cache
+    import artist_resolver
+    monkeypatch.setattr(main, 'data_dir', str(tmp_path))
+    monkeypatch.setattr(main, 'loaded_artists', artist_cache.ArtistCache(main.ARTIST_CACHE_MB * 1024 * 1024))
+    monkeypatch.setattr(main, 'resolved_artists', artist_resolver.ArtistResolver(str(tmp_path / 'artists.json'), 0))
+    return main
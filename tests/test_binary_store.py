@@ -0,0 +1,30 @@
+import gc
+import json
+
+from benchmarks import synthetic
+
+
+def save_json(app, name, artist_data):
+    with open(f"{app.data_dir}/{name}_lyrics.json", 'w', encoding='utf-8') as file:
+        json.dump(artist_data, file)
+
+
+def test_search_survives_save_and_eviction(app, monkeypatch):
+    monkeypatch.setattr(app, 'CACHE_FORMAT', 'binary')
+    save_json(app, 'artist', synthetic.make_artist_data(30))
+    app.load_cached_artist_data('artist')
+    app.loaded_artists.clear()
+    artist_data = app.load_cached_artist_data('artist')
+    assert type(artist_data['songs']).__name__ == 'MappedSongs'
+    expected = app.search_word_in_lyrics('a', artist_data, 'artist')
+
+    results = app.iter_search_word_in_lyrics('a', artist_data, 'artist')
+    first = next(results)
+    app.save_artist_data('artist', app.load_cached_artist_data('artist', use_memory=False))
+    app.loaded_artists.invalidate('artist')
+    assert [first] + list(results) == expected
+
+    mm = artist_data['songs'].store.mm
+    del results, artist_data
+    gc.collect()
+    assert mm.closed
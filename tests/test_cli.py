@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+
+def write_queries(tmp_path, *lines):
+    path = tmp_path / 'queries.jsonl'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_read_queries(app, tmp_path):
+    path = write_queries(tmp_path, '{"artist": "a", "word": "love"}', '', '{"artist": "b", "words": ["x", "y"]}')
+    assert app.read_queries(path) == [('a', 'love'), ('b', 'x'), ('b', 'y')]
+
+
+@pytest.mark.parametrize('line', [
+    '{"artist": "a", "words": "love"}',
+    '{"artist": "a", "words": []}',
+    '{"artist": ["a"], "word": "love"}',
+    '{"word": "love"}',
+    '["a", "love"]',
+    '"love"',
+])
+def test_read_queries_rejects_malformed(app, tmp_path, line):
+    with pytest.raises(ValueError):
+        app.read_queries(write_queries(tmp_path, line))
+
+
+def test_malformed_queries_are_usage_errors(app, tmp_path):
+    with pytest.raises(SystemExit) as exit_info:
+        app.run_cli(['--queries', write_queries(tmp_path, '[1, 2]')])
+    assert exit_info.value.code == 2
+
+
+def test_negative_max_songs_is_a_usage_error(app):
+    with pytest.raises(SystemExit) as exit_info:
+        app.run_cli(['-a', 'a', '-w', 'love', '--max-songs', '-1'])
+    assert exit_info.value.code == 2
+
+
+def test_run_cli_saved_artist(app, tmp_path):
+    from benchmarks import synthetic
+    with open(f"{app.data_dir}/artist_lyrics.json", 'w', encoding='utf-8') as file:
+        json.dump(synthetic.make_artist_data(5), file)
+    output = tmp_path / 'out.jsonl'
+    app.run_cli(['-a', 'artist', '-w', 'a', '-w', 'qqqq', '--no-download', '--max-songs', '2', '-o', str(output)])
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [record['word'] for record in records] == ['a', 'qqqq']
+    assert records[0]['songs'] <= 2
+    assert records[1]['songs'] == 0
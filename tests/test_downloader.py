@@ -0,0 +1,37 @@
+import pytest
+import requests
+
+import downloader
+
+
+def test_lyricsgenius_http_error_status():
+    policy = downloader.RetryPolicy()
+    assert downloader.error_status(requests.HTTPError(429, 'Too many requests')) == 429
+    assert policy.is_transient(requests.HTTPError(503, 'Unavailable'))
+    assert not policy.is_transient(requests.HTTPError(404, 'Not found'))
+
+
+def test_os_error_errno_is_not_a_status():
+    policy = downloader.RetryPolicy()
+    assert downloader.error_status(ConnectionResetError(104, 'Connection reset by peer')) is None
+    assert policy.is_transient(ConnectionResetError(104, 'Connection reset by peer'))
+
+
+def test_aiohttp_connection_reset_is_transient():
+    aiohttp = pytest.importorskip('aiohttp')
+    assert downloader.RetryPolicy().is_transient(aiohttp.ClientOSError(104, 'Connection reset by peer'))
+
+
+def test_retry_after_from_recorded_response():
+    session = requests.Session()
+    recorder = downloader.ResponseRecorder(session)
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '3'
+    recorder.clear()
+    for hook in session.hooks['response']:
+        hook(response)
+    error = requests.HTTPError(429, 'Too many requests')
+    recorder.attach(error)
+    assert downloader.error_status(error) == 429
+    assert downloader.retry_after(error) == 3.0
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.stub_server import StubGenius
+
+SONG_COUNT = 120  # three listing pages of 50
+JOURNALED_SONGS = 10
+
+
+@pytest.fixture
+def artist_data():
+    return synthetic.make_artist_data(SONG_COUNT, lines_per_song=10)
+
+
+@pytest.fixture
+def stub(artist_data):
+    pytest.importorskip('aiohttp')
+    with StubGenius(artist_data) as stub:
+        yield stub
+
+
+@pytest.fixture
+def fake_genius(app, artist_data, monkeypatch):
+    genius = synthetic.FakeGenius(artist_data, latency=0)
+    monkeypatch.setattr(app, 'genius', genius)
+    return genius
+
+
+def run_async(app, stub, **kwargs):
+    return app.run_artist_data_async('artist', api_root=stub.url, requests_per_second=1000, **kwargs)
+
+
+def songs_of(artist_data):
+    return [(song['id'], song['title'], song['lyrics']) for song in artist_data['songs']]
+
+
+# what a download should end with: every song in listing order, saved, journal gone
+def assert_downloaded(app, result, artist_data):
+    expected = sorted(songs_of(artist_data), key=lambda song: song[1])
+    assert songs_of(result) == expected
+    with open(os.path.join(app.data_dir, 'artist_lyrics.json'), encoding='utf-8') as file:
+        assert songs_of(json.load(file)) == expected
+    assert not os.path.exists(app.get_download_journal('artist').path)
+    assert 'missing_songs' not in result
+
+
+# a journal as left by a run interrupted after the first listing page and a few songs
+def interrupted_journal(app, artist_data, listing):
+    download_journal = app.get_download_journal('artist')
+    download_journal.record_artist(artist_data['artist'])
+    download_journal.record_page(1, listing, 2)
+    for song_info in listing[:JOURNALED_SONGS]:
+        song = next(song for song in artist_data['songs'] if song['id'] == song_info['id'])
+        download_journal.record_song(dict(song_info, lyrics=song['lyrics']))
+    return {song_info['id'] for song_info in listing[:JOURNALED_SONGS]}
+
+
+@pytest.mark.parametrize('lean', [True, False], ids=['lean', 'full'])
+def test_async_ingest(app, stub, artist_data, lean):
+    result = run_async(app, stub, lean=lean)
+    assert_downloaded(app, result, artist_data)
+    paths = stub.paths()
+    assert paths.count('/artists/1/songs') == 3
+    assert sum(path.startswith('/lyrics/') for path in paths) == SONG_COUNT
+    assert sum(path.startswith('/songs/') for path in paths) == (0 if lean else SONG_COUNT)
+
+
+def test_async_ingest_honors_retry_after(app, stub, artist_data):
+    stub.fail('/artists/1/songs', 429, retry_after=1)
+    stub.fail('/lyrics/5', 503)
+    result = run_async(app, stub)
+    assert_downloaded(app, result, artist_data)
+    throttled_at = next(at for at, path, status in stub.requests if status == 429)
+    next_at = min(at for at, path, status in stub.requests if at > throttled_at)
+    assert next_at - throttled_at >= 0.9
+    assert [status for _, path, status in stub.requests if path == '/lyrics/5'] == [503, 200]
+
+
+def test_async_ingest_resumes_from_journal(app, stub, artist_data):
+    journaled = interrupted_journal(app, artist_data, stub.listing(1, 50)['songs'])
+    result = run_async(app, stub)
+    assert_downloaded(app, result, artist_data)
+    paths = stub.paths()
+    assert '/search' not in paths
+    assert paths.count('/artists/1/songs') == 2
+    fetched = {int(path.rsplit('/', 1)[1]) for path in paths if path.startswith('/lyrics/')}
+    assert len(fetched) == SONG_COUNT - JOURNALED_SONGS
+    assert not fetched & journaled
+
+
+def test_async_ingest_keeps_transient_failures_missing(app, stub, artist_data, monkeypatch):
+    monkeypatch.setattr(app, 'SONG_RETRY_ROUNDS', 0)
+    monkeypatch.setattr(app.retry_policy, 'retries', 0)
+    stub.fail('/lyrics/7', 503)
+    result = run_async(app, stub)
+    assert [song_info['id'] for song_info in result['missing_songs']] == [7]
+    assert 7 not in {song['id'] for song in result['songs']}
+
+
+def test_threaded_ingest_resumes_from_journal(app, fake_genius, artist_data):
+    journaled = interrupted_journal(app, artist_data, fake_genius.artist_songs(1, page=1, per_page=50)['songs'])
+    fake_genius.calls.clear()
+    result = app.get_artist_data_with_progress('artist', requests_per_second=1000)
+    assert_downloaded(app, result, artist_data)
+    assert 'search_artist' not in fake_genius.calls
+    assert fake_genius.calls['artist_songs'] == 2
+    assert fake_genius.calls['lyrics'] == SONG_COUNT - JOURNALED_SONGS
+    assert journaled == {song['id'] for song in result['songs'][:JOURNALED_SONGS]}
+
+
+def test_threaded_and_async_ingests_agree(app, stub, fake_genius, artist_data):
+    threaded = app.get_artist_data_with_progress('artist', requests_per_second=1000)
+    os.remove(os.path.join(app.data_dir, 'artist_lyrics.json'))
+    app.loaded_artists.clear()
+    assert songs_of(run_async(app, stub)) == songs_of(threaded)
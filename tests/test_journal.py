@@ -0,0 +1,32 @@
+import journal
+
+
+def test_resume_after_torn_line(tmp_path):
+    path = tmp_path / 'artist_lyrics.partial.jsonl'
+    first = journal.DownloadJournal(str(path))
+    first.record_page(1, [{'id': 1}], 2)
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"page": 2, "songs": [{"id"')
+
+    resumed = journal.DownloadJournal(str(path))
+    state = resumed.load()
+    assert [song['id'] for song in state['listing']] == [1]
+    assert state['next_page'] == 2
+    resumed.record_page(2, [{'id': 2}], 3)
+    resumed.record_page(3, [{'id': 3}], None)
+
+    state = journal.DownloadJournal(str(path)).load()
+    assert [song['id'] for song in state['listing']] == [1, 2, 3]
+    assert state['listing_complete']
+
+
+def test_songs_replayed(tmp_path):
+    download_journal = journal.DownloadJournal(str(tmp_path / 'artist_lyrics.partial.jsonl'))
+    assert download_journal.load()['artist'] is None
+    download_journal.record_artist({'id': 7, 'name': 'Artist'})
+    download_journal.record_song({'id': 1, 'title': 'One', 'lyrics': 'la la'})
+    state = download_journal.load()
+    assert state['artist'] == {'id': 7, 'name': 'Artist'}
+    assert state['songs'] == {1: {'id': 1, 'title': 'One', 'lyrics': 'la la'}}
+    download_journal.discard()
+    assert download_journal.load()['songs'] == {}
@@ -0,0 +1,138 @@
+import functools
+import json
+import os
+import re
+import shutil
+
+import pytest
+
+import batch_search
+import lyrics_index
+from benchmarks import synthetic
+from conftest import ROOT
+
+
+# search_word_in_lyrics as it was before the corpus, token index and trigram index:
+# every search must still give exactly this
+def baseline_search(word, artist_data, artist_name):
+    word = word.lower()
+    found = False
+    result = []
+    if 'songs' in artist_data:
+        for song in artist_data['songs']:
+            if not song.get('lyrics'):
+                continue
+            lyrics_lines = song['lyrics'].split('\n')
+            matching_lines = [line for line in lyrics_lines if word in re.sub(r'\[.*?\]', '', line).lower()]
+            if matching_lines:
+                result.append((song['title'], matching_lines))
+                found = True
+    if not found:
+        result.append((f"Word '{word}' not found in any song of artist '{artist_name}'.", []))
+    return result
+
+
+# the counts search_words_in_lyrics gives next to each result, from the baseline scan
+def baseline_counts(word, artist_data):
+    word = word.lower()
+    songs = lines = matches = 0
+    for song in artist_data['songs']:
+        if not song.get('lyrics'):
+            continue
+        song_lines = [line for line in song['lyrics'].split('\n') if word in lyrics_index.normalize_line(line)]
+        songs += bool(song_lines)
+        lines += len(song_lines)
+        if word and '\n' not in word:
+            matches += sum(batch_search.count_occurrences(lyrics_index.normalize_line(line), word) for line in song_lines)
+    return {'songs': songs, 'lines': lines, 'matches': matches}
+
+
+EDGE_CASES = {
+    'artist': {'name': 'Edge Cases', 'id': 1},
+    'songs': [
+        {'id': 1, 'title': 'Brackets', 'lyrics': '[Verse 1: Love]\nI love you [love]\n[Chorus]\nGlove, LOVE, lovely\n'},
+        {'id': 2, 'title': 'Empty', 'lyrics': ''},
+        {'id': 3, 'title': 'Missing', 'lyrics': None},
+        {'id': 4, 'title': 'Unicode', 'lyrics': 'Café del Mar\nİstanbul ve İzmir\nStraße und STRASSE\nñandú ñ\n\n'},
+        {'id': 5, 'title': 'Brackets', 'lyrics': 'lalala la\n[unclosed bracket love\n]closing] first\n  spaced  out  '},
+        {'id': 6, 'title': 'No lyrics key'},
+        {'id': 7, 'title': 'Windows', 'lyrics': 'carriage\r\nreturn love\r\n'},
+    ],
+}
+
+WORDS = ['', '\n', ' ', 'a', 'l', 'la', 'lo', 'é', 'ñ', 'İ', 'i̇', 'ß', 'love', 'LOVE', 'Love You', 'lala', 'lalala',
+         'glove', 'verse', 'chorus', '[verse', '[', ']', 'ed]', 'straße', 'strasse', 'café', 'ñandú', 'istanbul',
+         'i̇stanbul', 'love\nglove', 'return', '\r', 'nothing here', '  ', 'zzz']
+
+
+def artist_sources():
+    sources = {'edge': EDGE_CASES, 'synthetic': synthetic.make_artist_data(40)}
+    for name in ('spg', 'ecco2k'):
+        with open(os.path.join(ROOT, 'data', f"{name}_lyrics.json"), encoding='utf-8') as file:
+            sources[name] = json.load(file)
+    return sources
+
+
+SOURCES = artist_sources()
+
+
+# the baseline results of a word on one of SOURCES, shared by every loading mode
+@functools.lru_cache(maxsize=None)
+def expected(word, name):
+    return baseline_search(word, SOURCES[name], name), baseline_counts(word, SOURCES[name])
+
+
+# artist data loaded the way main serves it: from JSON, from the binary copy, or from JSON
+# with the trigram index already built
+@pytest.fixture(params=['json', 'binary', 'trigram'])
+def loaded(request, app, monkeypatch):
+    mode = request.param
+    monkeypatch.setattr(app, 'CACHE_FORMAT', 'binary' if mode == 'binary' else 'json')
+
+    def load(name):
+        with open(os.path.join(app.data_dir, f"{name}_lyrics.json"), 'w', encoding='utf-8') as file:
+            json.dump(SOURCES[name], file, ensure_ascii=False)
+        artist_data = app.load_cached_artist_data(name)
+        if mode == 'binary':
+            # the first load writes the binary copy, the next one maps it
+            app.loaded_artists.clear()
+            artist_data = app.load_cached_artist_data(name)
+            assert type(artist_data['songs']).__name__ == 'MappedSongs'
+        elif mode == 'trigram':
+            lyrics_index.get_corpus(artist_data).trigram_index()
+        return artist_data
+    return load
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_search_word_matches_baseline(app, loaded, name):
+    artist_data = loaded(name)
+    # plus a few words the artist actually sings
+    words = WORDS + sorted({line.split(' ')[0].lower() for song in SOURCES[name]['songs'][:5]
+                            for line in (song.get('lyrics') or '').split('\n')})[:12]
+    for word in words:
+        result = expected(word, name)[0]
+        assert app.search_word_in_lyrics(word, artist_data, name) == result, repr(word)
+        assert list(app.iter_search_word_in_lyrics(word, artist_data, name, 1)) == result[:1], repr(word)
+
+
+@pytest.mark.parametrize('aho', [True, False], ids=['ahocorasick', 'separately'])
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_search_words_matches_baseline(app, loaded, monkeypatch, name, aho):
+    if aho:
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(batch_search, 'ahocorasick', None)
+    artist_data = loaded(name)
+    results, counts = app.search_words_in_lyrics(WORDS, artist_data, name)
+    for word in WORDS:
+        assert (results[word], counts[word]) == expected(word, name), repr(word)
+
+
+def test_bundled_binary_copy_matches_json(app, monkeypatch):
+    monkeypatch.setattr(app, 'CACHE_FORMAT', 'binary')
+    shutil.copy(os.path.join(ROOT, 'data', 'spg_lyrics.json'), app.data_dir)
+    app.load_cached_artist_data('spg')
+    app.loaded_artists.clear()
+    mapped = app.load_cached_artist_data('spg')
+    assert list(mapped['songs']) == SOURCES['spg']['songs']
@@ -0,0 +1,51 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks import synthetic
+
+
+@pytest.fixture
+def server(app):
+    import server
+    with open(f"{app.data_dir}/artist_lyrics.json", 'w', encoding='utf-8') as file:
+        json.dump(synthetic.make_artist_data(10), file)
+    httpd = server.make_server('127.0.0.1', 0, 2)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, json.dumps(body).encode('utf-8'), {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_search(server):
+    status, body = post(f"{server}/search", {'artist': 'artist', 'words': ['a', 'zzzz'], 'max_songs': 2})
+    assert status == 200
+    assert set(body['words']) == {'a', 'zzzz'}
+
+
+@pytest.mark.parametrize('body', [
+    {'artist': ['artist'], 'word': 'a'},
+    {'artist': '', 'word': 'a'},
+    {'artist': '../../tmp/x', 'word': 'a'},
+    {'artist': 'artist', 'words': 'a'},
+    {'artist': 'artist', 'word': 'a', 'max_songs': -1},
+])
+def test_search_rejects_bad_requests(server, body):
+    assert post(f"{server}/search", body)[0] == 400
+
+
+@pytest.mark.parametrize('artist', [['artist'], '../outside', '/tmp/x', None])
+def test_ingest_rejects_bad_artist(server, artist):
+    assert post(f"{server}/ingest", {'artist': artist})[0] == 400